@@ -0,0 +1,21 @@
+"""Headless serpentine engine.
+
+The simulation classes here have no pygame dependency; the pygame frontend
+lives in ``serpentine_engine.frontend`` and is only imported by the launcher
+scripts.
+"""
+from .grid import OccupancyGrid
+from .model import Point, Egg, Snake
+from .planning import InlinePlanner, ThreadPlanner, ProcessPlanner, IncrementalPlanner, FieldPlanner, PLANNERS
+from .simulation import Simulation, StepResult, DIRECTIONS, UP, DOWN, LEFT, RIGHT
+from .classic import ClassicSimulation
+from .hard import HardSimulation
+from .v5 import V5Simulation
+from .replay import Recording
+
+# Ruleset name -> simulation class
+RULESETS = {
+    "classic": ClassicSimulation,
+    "hard": HardSimulation,
+    "v5": V5Simulation,
+}
@@ -0,0 +1,127 @@
+"""Run a ruleset headless as fast as possible: python -m serpentine_engine --ruleset v5"""
+import argparse
+import random
+import time
+
+from . import RULESETS, DIRECTIONS, PLANNERS, Recording, V5Simulation
+from .instrumentation import Instruments
+
+
+def autopilot(rng, turn_chance=0.1):
+    """Random-turn player input so headless runs do not sit paused against a wall."""
+    if rng.random() < turn_chance:
+        return rng.choice(DIRECTIONS)
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless serpentine simulation")
+    parser.add_argument("--ruleset", choices=sorted(RULESETS), default="classic")
+    parser.add_argument("--ticks", type=int, default=10000, help="total ticks to simulate")
+    parser.add_argument("--width", type=int, default=None, help="grid width (ruleset default if omitted)")
+    parser.add_argument("--height", type=int, default=None, help="grid height (ruleset default if omitted)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for a reproducible run (game n uses seed + n)")
+    parser.add_argument("--planner", choices=sorted(PLANNERS), default="inline",
+                        help="where v5 enemies plan their moves")
+    parser.add_argument("--search", choices=("astar", "jps"), default=None,
+                        help="path search used by the inline, threads and processes planners (ruleset default if omitted)")
+    parser.add_argument("--rules", action="store_true", help="print the ruleset's rule profile and exit")
+    parser.add_argument("--record", metavar="FILE", help="save the first game as a replay file")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="play a replay file back headless at full speed instead of simulating")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="with --replay, watch it in the window at this many times real time")
+    parser.add_argument("--phases", metavar="FILE",
+                        help="time every phase of every tick, write them to FILE as JSON lines and print a summary")
+    parser.add_argument("--chrome-trace", metavar="FILE",
+                        help="time every phase and write a Chrome trace (chrome://tracing, Perfetto) to FILE")
+    args = parser.parse_args(argv)
+    if args.rules:
+        for name, value in RULESETS[args.ruleset].rule_profile().items():
+            print(f"{name:<24} {value}")
+        return
+    if args.replay:
+        replay(args.replay, args.speed)
+        return
+
+    rng = random.Random(args.seed)  # Autopilot input, separate from the games' own rng
+    simulation_class = RULESETS[args.ruleset]
+    options = {}
+    if issubclass(simulation_class, V5Simulation):
+        options["planner"] = PLANNERS[args.planner]()
+        options["search"] = args.search
+
+    instruments = None
+    if args.phases or args.chrome_trace:
+        instruments = Instruments(jsonl=open(args.phases, "w") if args.phases else None,
+                                  trace=bool(args.chrome_trace))
+    recording = None
+    games = 0
+    ticks = 0
+    start = time.perf_counter()
+    while ticks < args.ticks:
+        seed = None if args.seed is None else args.seed + games
+        sim = simulation_class(args.width, args.height, seed=seed, **options)
+        if instruments is not None:
+            instruments.budget = sim.frame_time
+            sim.instruments = instruments
+        if args.record and not games:
+            recording = Recording.start(sim)
+        games += 1
+        while ticks < args.ticks and not sim.game_over:
+            action = autopilot(rng)
+            if recording is not None and games == 1:
+                recording.record(sim, action)
+            sim.step(action)
+            ticks += 1
+    elapsed = time.perf_counter() - start
+    if "planner" in options:
+        options["planner"].shutdown()
+    if recording is not None:
+        recording.save(args.record)
+
+    print(f"{args.ruleset}: {ticks} ticks in {elapsed:.2f}s "
+          f"({ticks / elapsed:.0f} ticks/s, {games} games)")
+    if instruments is not None:
+        if instruments.jsonl is not None:
+            instruments.jsonl.close()
+        if args.chrome_trace:
+            instruments.write_chrome_trace(args.chrome_trace)
+        print_summary(instruments.summary())
+
+
+def print_summary(summary):
+    """Per-phase timings of the last ticks, slowest first."""
+    for name, stats in sorted(summary["phases"].items(), key=lambda entry: -entry[1]["mean_ms"]):
+        print(f"  {name:<12} mean {stats['mean_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f} ms  "
+              f"max {stats['max_ms']:8.3f} ms")
+    for enemy_index, stats in summary["searches"].items():
+        print(f"  enemy {enemy_index + 1:<6} search {stats['mean_ms']:8.3f} ms  "
+              f"{stats['mean_expanded']:.0f} nodes ({stats['count']} searches)")
+    for tick, milliseconds, slowest in summary["slow_ticks"]:
+        print(f"  tick {tick} took {milliseconds:.0f} ms, mostly {slowest}")
+
+
+def replay(path, speed=None):
+    recording = Recording.load(path)
+    sim = recording.simulation()
+    if speed is not None:
+        import pygame
+        from .frontend import Game
+        Game(sim, hud="v5" if recording.ruleset == "v5" else "classic", actions=recording.actions(),
+             time_scale=speed).run()
+        pygame.quit()
+    else:
+        start = time.perf_counter()
+        result = recording.play(sim)
+        elapsed = time.perf_counter() - start
+        print(f"{recording.ruleset} replay: {result.tick} ticks in {elapsed:.2f}s "
+              f"({result.tick / elapsed:.0f} ticks/s), score {result.score}"
+              + (f", {result.end_message}" if result.game_over else ""))
+    if hasattr(sim, "planner"):
+        sim.planner.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Benchmark suite: python -m serpentine_engine.bench [--quick] [--out results.json]
+
+Scenarios (``--only`` keeps those whose name contains the given text):
+
+* ``ticks/<ruleset>/<w>x<h>/<n>``: step() under random-turn input with n enemies
+* ``path/<search>/<board>/<w>x<h>``: one corner-to-corner search on a canned board
+* ``food/<fill>%``: spawn_food() on a board that full of eggs
+* ``draw/<ruleset>/full|frame``: Game.draw() into an offscreen window (needs pygame)
+
+Every scenario reports its timings in milliseconds plus what it measured
+(ticks/s, nodes expanded, ...), and the whole run is written as one JSON
+document so runs of different versions can be diffed; ``--compare OLD.json``
+prints the change in mean time against an earlier run.  ``--profile DIR``
+writes a cProfile dump per scenario (snakeviz or flameprof turn it into a
+flame graph).  Everything is seeded, so two runs do the same work.
+"""
+import argparse
+import cProfile
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from . import RULESETS, DIRECTIONS, pathfinding
+from .grid import SNAKE
+from .model import Egg, Point
+from .planning import InlinePlanner
+from .simulation import FOOD
+
+SEED = 2024
+
+
+def timings(samples):
+    """Summary of per-call times given in seconds, reported in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "calls": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "median_ms": ordered[len(ordered) // 2] * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def new_simulation(ruleset, width, height, enemies, seed):
+    """A seeded game with ``enemies`` enemies; the extra ones are laid out straight on free rows."""
+    options = {"planner": InlinePlanner()} if ruleset == "v5" else {}
+    sim = RULESETS[ruleset](width, height, seed=seed, **options)
+    layout = random.Random(seed)
+    while len(sim.enemies) < enemies:
+        x = layout.randrange(0, sim.grid_width - 2)
+        y = layout.randrange(0, sim.grid_height)
+        body = [Point(x, y), Point(x + 1, y), Point(x + 2, y)]
+        if y != sim.grid_height // 2 and all(sim.grid.is_free(point) for point in body):
+            sim.enemies.append(sim.new_enemy(body))
+    return sim
+
+
+# --- Scenarios ---
+
+def bench_ticks(ruleset, width, height, enemies, ticks):
+    inputs = random.Random(SEED)
+    samples = []
+    games = 0
+    while len(samples) < ticks:
+        sim = new_simulation(ruleset, width, height, enemies, SEED + games)
+        games += 1
+        while len(samples) < ticks and not sim.game_over:
+            action = inputs.choice(DIRECTIONS) if inputs.random() < 0.1 else None
+            start = time.perf_counter()
+            sim.step(action)
+            samples.append(time.perf_counter() - start)
+    result = timings(samples)
+    result["ticks_per_second"] = len(samples) / sum(samples)
+    result["games"] = games
+    return result
+
+
+def board(kind, width, height):
+    """Obstacle flags for a canned board; the corners stay open for the searches."""
+    flags = bytearray(width * height)
+    if kind == "scatter":  # 30% of cells blocked at random
+        layout = random.Random(SEED)
+        for cell in layout.sample(range(width * height), width * height * 3 // 10):
+            flags[cell] = SNAKE
+    elif kind == "maze":  # Walls every fourth column with the gap alternating top and bottom
+        for wall, x in enumerate(range(2, width - 1, 4)):
+            gap = 0 if wall % 2 else height - 1
+            for y in range(height):
+                if y != gap:
+                    flags[y * width + x] = SNAKE
+    flags[0] = flags[-1] = 0
+    return bytes(flags)
+
+
+def bench_path(search, kind, width, height, repeat):
+    flags = board(kind, width, height)
+    find = pathfinding.SEARCHES[search]
+    goal = width * height - 1
+    stats = {}
+    samples = []
+    path = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        path = find(flags, width, height, 0, goal, stats=stats)
+        samples.append(time.perf_counter() - start)
+    result = timings(samples)
+    result["expanded"] = stats["expanded"]
+    result["path_length"] = len(path) - 1 if path else None
+    return result
+
+
+def bench_food(fill, repeat):
+    sim = new_simulation("classic", 80, 60, 2, SEED)
+    layout = random.Random(SEED)
+    free = [Point(x, y) for y in range(sim.grid_height) for x in range(sim.grid_width)
+            if sim.grid.is_free(Point(x, y))]
+    for point in layout.sample(free, len(free) * fill // 100):
+        sim.add_egg(sim.enemy_eggs, Egg(point, 0, "enemy"))
+    samples = []
+    for _ in range(repeat):
+        sim.food = None
+        sim.schedule.set(FOOD, None, 0)
+        start = time.perf_counter()
+        sim.spawn_food(0)
+        samples.append(time.perf_counter() - start)
+    return timings(samples)
+
+
+def bench_draw(ruleset, mode, frames):
+    from .frontend import Game
+    sim = new_simulation(ruleset, None, None, 8, SEED)
+    game = Game(sim, hud="v5" if ruleset == "v5" else "classic")
+    inputs = random.Random(SEED)
+    game.draw()
+    samples = []
+    for _ in range(frames):
+        if mode == "full":
+            game.drawn_cells = None  # Force a repaint of the whole window
+        elif not sim.game_over:
+            sim.step(inputs.choice(DIRECTIONS) if inputs.random() < 0.1 else None)
+        start = time.perf_counter()
+        game.draw()
+        samples.append(time.perf_counter() - start)
+    return timings(samples)
+
+
+def scenarios(quick=False):
+    """(name, function, keyword arguments) for every scenario."""
+    ticks = 200 if quick else 1000
+    repeat = 5 if quick else 30
+    found = []
+    for ruleset in ("classic", "hard", "v5"):
+        width, height = RULESETS[ruleset].grid_width, RULESETS[ruleset].grid_height
+        for width, height in ((width, height), (width * 2, height * 2), (1000, 1000)):  # The last one is chunked
+            for enemies in (2, 16):
+                found.append((f"ticks/{ruleset}/{width}x{height}/{enemies}", bench_ticks,
+                              dict(ruleset=ruleset, width=width, height=height, enemies=enemies, ticks=ticks)))
+    for search in pathfinding.SEARCHES:
+        for kind in ("open", "scatter", "maze"):
+            for width, height in ((80, 60), (200, 200)):
+                found.append((f"path/{search}/{kind}/{width}x{height}", bench_path,
+                              dict(search=search, kind=kind, width=width, height=height, repeat=repeat)))
+    for fill in (0, 50, 90, 99):
+        found.append((f"food/{fill}%", bench_food, dict(fill=fill, repeat=repeat * 10)))
+    for ruleset in ("classic", "v5"):
+        for mode in ("full", "frame"):
+            found.append((f"draw/{ruleset}/{mode}", bench_draw, dict(ruleset=ruleset, mode=mode, frames=repeat * 4)))
+    return found
+
+
+def pygame_version():
+    try:
+        import pygame
+    except ImportError:
+        return None
+    return pygame.version.ver
+
+
+def run(only=None, quick=False, profile_dir=None, log=print):
+    """Run the scenarios and return the results document."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Offscreen window for the draw scenarios
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    has_pygame = pygame_version() is not None
+    results = []
+    for name, function, params in scenarios(quick):
+        if only and not any(text in name for text in only):
+            continue
+        if function is bench_draw and not has_pygame:
+            log(f"{name}: skipped (pygame is not installed)")
+            continue
+        profiler = cProfile.Profile() if profile_dir else None
+        if profiler:
+            profiler.enable()
+        metrics = function(**params)
+        if profiler:
+            profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(profile_dir, name.replace("/", "_").replace("%", "pct") + ".prof"))
+        results.append({"name": name, "params": params, "metrics": metrics})
+        log(f"{name}: {metrics['mean_ms']:.3f} ms mean, {metrics['p99_ms']:.3f} ms p99")
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": pathfinding.numpy is not None,
+        "pygame": pygame_version(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def compare(old, new, log=print):
+    """Print the change in mean time of every scenario present in both documents."""
+    before = {result["name"]: result["metrics"]["mean_ms"] for result in old["results"]}
+    for result in new["results"]:
+        name = result["name"]
+        if name in before:
+            mean = result["metrics"]["mean_ms"]
+            change = (mean / before[name] - 1) * 100 if before[name] else 0.0
+            log(f"{name}: {before[name]:.3f} -> {mean:.3f} ms ({change:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the serpentine engine, pathfinder and renderer")
+    parser.add_argument("--only", action="append", metavar="TEXT",
+                        help="run only scenarios whose name contains TEXT (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="fewer ticks and repeats, for a fast smoke run")
+    parser.add_argument("--out", metavar="FILE", help="write the results as JSON to FILE")
+    parser.add_argument("--compare", metavar="FILE", help="earlier results to compare against")
+    parser.add_argument("--profile", metavar="DIR", help="write a cProfile dump per scenario into DIR")
+    args = parser.parse_args(argv)
+
+    document = run(args.only, args.quick, args.profile)
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(document, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(json.load(file), document)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
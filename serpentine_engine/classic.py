@@ -0,0 +1,239 @@
+"""Classic rules (serpentine.py): greedy enemies with a small detection range."""
+
+try:
+    import numpy
+except ImportError:  # Optional: enemy decisions fall back to one enemy at a time
+    numpy = None
+
+from .model import GREEN
+from .simulation import Simulation, DIRECTIONS
+
+# Fewer due enemies than this are cheaper to decide one by one than to pack into arrays
+BATCH_MIN_ENEMIES = 16
+
+
+class ClassicSimulation(Simulation):
+    grid_width = 40
+    grid_height = 30
+    detection_divisors = (4, 2)  # Egg detection range of normal-sized enemies: grid width // 4, height // 2
+    tail_chase_range = None  # Enemies chase the player's tail within this many cells in x and in y (None: never)
+
+    RULE_SETTINGS = Simulation.RULE_SETTINGS + ("detection_divisors", "tail_chase_range")
+
+    def detection_range(self, enemy):
+        # Detection range calculation based on enemy length - Increased radius for short snakes
+        if len(enemy.body) <= 2:
+            return self.grid_width, self.grid_height
+        divisor_x, divisor_y = self.detection_divisors
+        return self.grid_width // divisor_x, self.grid_height // divisor_y
+
+    def move_due_enemies(self, movers, current_tick):
+        # Decide for every due enemy at once, then move them in order.  An earlier
+        # move can only invalidate a later decision through the cells it changed
+        # (logged by the grid) or the egg it ate; those few get decided again.
+        decisions = self.enemy_decisions(movers)
+        grid = self.grid
+        outer_log, grid.changes = grid.changes, []
+        touched = set()
+        eaten = set()
+        try:
+            for enemy, (egg_obj, cells, valid_moves) in zip(movers, decisions):
+                touched.update(grid.changes)
+                grid.changes.clear()
+                if egg_obj in eaten:
+                    egg_obj = self.first_egg_in_range(enemy)
+                if touched and not touched.isdisjoint(cells):
+                    cells, valid_moves = self.usable_moves(enemy)
+                egg_obj = self.move_enemy(enemy, egg_obj, valid_moves)
+                if egg_obj is not None:
+                    eaten.add(egg_obj)
+                if self.game_over: # Bitten tail was the player's last segment
+                    break
+        finally:
+            if outer_log is not None:
+                outer_log.extend(touched)
+                outer_log.extend(grid.changes)
+            grid.changes = outer_log
+
+    def move_enemy(self, enemy, egg_obj, valid_moves):
+        """Greedy move towards the player's tail, the egg or else the food; returns the egg if it got eaten."""
+        e_head = enemy.body[0]
+        target_food = self.food
+        target_player_tail = self.tail_in_reach(enemy)
+        if target_player_tail: # The tail beats eggs
+            egg_obj = None
+        target_player_egg = egg_obj.get_point() if egg_obj is not None else None
+        enemy_grew = False
+        eaten = None
+
+        possible_moves = list(DIRECTIONS)
+        if not valid_moves: # No valid moves, choose randomly from all (potentially colliding)
+            moves_to_use = possible_moves
+        else:
+            moves_to_use = valid_moves
+
+        if target_player_tail: # Move towards player tail if detected (highest priority)
+            dx, dy = self.move_towards(e_head, target_player_tail, moves_to_use, possible_moves)
+        elif target_player_egg: # Move towards player egg if detected (prioritized over food)
+            dx, dy = self.move_towards(e_head, target_player_egg, moves_to_use, possible_moves)
+        elif target_food: # Move towards food if detected
+            dx, dy = self.move_towards(e_head, target_food, moves_to_use, possible_moves)
+        elif valid_moves: # No target, use any valid move if available
+            dx, dy = self.rng.choice(valid_moves)
+        else: # No valid moves, choose randomly from all (potentially colliding)
+            dx, dy = self.rng.choice(possible_moves)
+
+        new_e_head = self.clamp(e_head.x + dx, e_head.y + dy)
+        if self.stuck_seconds is not None:
+            new_e_head = self.unstick(enemy, new_e_head, valid_moves or possible_moves)
+
+        if not enemy.occupies(new_e_head):
+            enemy.push_head(new_e_head)
+            if target_food and new_e_head == target_food: # Eat food
+                enemy.grow(1)  # Grow enemy by 1 (original behaviour)
+                self.food = None
+                enemy_grew = True
+            elif target_player_egg and new_e_head == target_player_egg: # Eat player egg
+                enemy.grow(2) # Grow by 2 segments
+                self.remove_egg(self.player_eggs, egg_obj) # Remove eaten egg, remove Egg object
+                enemy_grew = True
+                eaten = egg_obj
+            elif target_player_tail and new_e_head == target_player_tail:
+                enemy.grow(2) # Grow significantly by targeting tail
+                self.player.pop_tail() # Player loses tail segment when tail eaten
+                if self.player.body: # Ensure player is still alive after losing tail
+                    self.player.pop_tail() # Remove one more segment, for significant tail bite
+                if not self.player.body:
+                    self.end_game(f"Game Over! Score: {self.score}") # Player dies if tail bite removes last segment
+                    return None
+                enemy_grew = True
+
+            if not enemy_grew:
+                enemy.pop_tail()
+
+        self.update_green_status(enemy)
+        return eaten
+
+    def tail_in_reach(self, enemy):
+        """The player's tail if it is within tail_chase_range cells of the enemy's head in x and in y, else None."""
+        if self.tail_chase_range is None:
+            return None
+        e_head = enemy.body[0]
+        player_tail = self.player.body[-1]
+        if abs(e_head.x - player_tail.x) <= self.tail_chase_range and abs(e_head.y - player_tail.y) <= self.tail_chase_range:
+            return player_tail
+        return None
+
+    def unstick(self, enemy, new_e_head, escape_moves):
+        """Where the enemy's head goes instead of ``new_e_head`` once it has stayed put for stuck_seconds.
+
+        A head that is not moving (pushed against a wall) starts a timer; when
+        it runs out the enemy takes a random one of ``escape_moves``.
+        """
+        e_head = enemy.body[0]
+        if new_e_head != e_head: # Head moved successfully
+            enemy.last_head_position = None # Reset stuck detection
+            enemy.stuck_timer_start_tick = 0
+        elif enemy.last_head_position is None: # First detection of being stuck
+            enemy.last_head_position = e_head
+            enemy.stuck_timer_start_tick = self.tick
+        elif self.tick - enemy.stuck_timer_start_tick >= self.ticks(self.stuck_seconds): # Stuck too long
+            escape_dx, escape_dy = self.rng.choice(escape_moves)
+            new_e_head = self.clamp(e_head.x + escape_dx, e_head.y + escape_dy) # Force move in escape direction
+            enemy.last_head_position = None # Reset stuck status after escape attempt
+            enemy.stuck_timer_start_tick = 0 # Reset stuck timer
+        return new_e_head
+
+    def first_egg_in_range(self, enemy):
+        """First player egg within the enemy's detection range (eggs beat food), or None."""
+        detection_range_x, detection_range_y = self.detection_range(enemy)
+        return self.player_eggs.first_in_range(enemy.body[0], detection_range_x, detection_range_y)
+
+    def usable_moves(self, enemy):
+        """Cells the head could step to (in DIRECTIONS order) and the moves not onto another enemy."""
+        e_head = enemy.body[0]
+        cells = []
+        valid_moves = []
+        for move in DIRECTIONS:
+            dx, dy = move
+            new_e_head = self.clamp(e_head.x + dx, e_head.y + dy)
+            cells.append(self.grid.cell(new_e_head))
+            if not self.other_enemy_at(enemy, new_e_head): # Check collision with other enemies
+                valid_moves.append(move)
+        return cells, valid_moves
+
+    def enemy_decisions(self, movers):
+        """``(egg, cells, valid_moves)`` per enemy, all taken against the current board.
+
+        With NumPy the four neighbour cells of every head are one clipped
+        index array and their enemy counts one gather from the grid layer;
+        without it each enemy is checked in turn.  Eggs come from the spatial
+        index either way, one lookup per enemy.  Against deciding each enemy
+        as it moves, this takes 9-21% off a classic or hard tick with 16
+        enemies (bench.py ticks/classic/*/16 and ticks/hard/*/16).
+        """
+        if numpy is None or len(movers) < BATCH_MIN_ENEMIES:
+            return [(self.first_egg_in_range(enemy), *self.usable_moves(enemy)) for enemy in movers]
+
+        heads = numpy.array([(enemy.body[0].x, enemy.body[0].y) for enemy in movers], dtype=numpy.int32)
+        head_x = heads[:, 0]
+        head_y = heads[:, 1]
+
+        steps = numpy.array(DIRECTIONS)
+        cells = (numpy.clip(head_y[:, None] + steps[None, :, 1], 0, self.grid_height - 1) * self.grid_width
+                 + numpy.clip(head_x[:, None] + steps[None, :, 0], 0, self.grid_width - 1))
+        if self.grid.chunked:
+            enemies = self.grid.enemies
+            segments = numpy.array([enemies[cell] for cell in cells.ravel().tolist()]).reshape(cells.shape)
+        else:
+            segments = numpy.frombuffer(self.grid.enemies, dtype=numpy.uint16)[cells]
+
+        decisions = []
+        for enemy, enemy_cells, enemy_segments in zip(movers, cells.tolist(), segments.tolist()):
+            own = enemy.cells
+            valid_moves = [move for move, cell, count in zip(DIRECTIONS, enemy_cells, enemy_segments)
+                           if not count or count <= own.get(cell, 0)]
+            decisions.append((self.first_egg_in_range(enemy), enemy_cells, valid_moves))
+        return decisions
+
+    def move_towards(self, e_head, target, moves_to_use, possible_moves):
+        """Greedy step towards target, falling back to a random usable move."""
+        dx = 0
+        dy = 0
+        if e_head.x < target.x:
+            dx = 1
+        elif e_head.x > target.x:
+            dx = -1
+        if e_head.y < target.y:
+            dy = 1
+        elif e_head.y > target.y:
+            dy = -1
+        move_towards_target = (dx, dy)
+        if move_towards_target in moves_to_use: # Prioritize valid move towards target
+            return move_towards_target
+        elif moves_to_use: # If direct move invalid, use any valid move
+            return self.rng.choice(moves_to_use)
+        # No valid moves at all, use a potentially colliding move
+        return move_towards_target if move_towards_target in possible_moves else self.rng.choice(possible_moves)
+
+    def collide_enemies(self, enemies_to_remove):
+        # Collision with Enemies
+        for i, enemy in enumerate(self.enemies):
+            if self.player.body[0] == enemy.body[0]:
+                if enemy.color == GREEN:
+                    enemies_to_remove.append(i)
+                    self.grew = True
+                    self.score += 50
+                else:
+                    self.end_game(f"Game Over! Score: {self.score}")
+                    return False
+            elif enemy.occupies_behind_head(self.player.body[0]):
+                original_enemy_length = len(enemy.body) # Store original enemy length
+                pos = enemy.segment_index(self.player.body[0])
+                enemy.truncate(pos)
+                removed_length = original_enemy_length - len(enemy.body) # Calculate removed length
+                self.player.grow(removed_length) # Player grows by removed length
+                self.grew = True
+                if len(enemy.body) <= 2: # Turn green if length is now 1 or 2
+                    self.turn_green(enemy)
+        return True
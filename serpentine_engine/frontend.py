@@ -0,0 +1,496 @@
+"""Thin pygame frontend: reads the keyboard, steps a Simulation and draws it."""
+import functools
+import math
+import time
+
+import pygame
+
+from .instrumentation import Instruments
+from .model import BLACK, WHITE, RED, GREEN, YELLOW, CYAN, PINK
+from .replay import Recording
+from .simulation import UP, DOWN, LEFT, RIGHT
+
+CELL_SIZE = 20
+# Largest window, in cells; bigger worlds are shown through a camera that follows the player
+MAX_VIEW_COLUMNS = 80
+MAX_VIEW_ROWS = 60
+# The camera recentres on the player's head when it comes this close to the edge of the view
+CAMERA_MARGIN = 8
+# Most simulation ticks run back to back in one frame when catching up after a stall
+MAX_CATCH_UP_TICKS = 5
+# Ticks between refreshes of the performance overlay text
+OVERLAY_REFRESH_TICKS = 10
+# Rendered HUD texts kept before the cache starts over (the timer and overlay keep making new ones)
+MAX_TEXT_SURFACES = 512
+# Share of the window a frame may repaint piece by piece; past it draw() repaints the whole window in one go
+FULL_REPAINT_SHARE = 0.5
+
+# Arrow keys in the order the original games polled them
+KEY_DIRECTIONS = (
+    (pygame.K_UP, UP),
+    (pygame.K_DOWN, DOWN),
+    (pygame.K_LEFT, LEFT),
+    (pygame.K_RIGHT, RIGHT),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def font(size):
+    """The default font at ``size``, loaded once per process (pygame must be initialised)."""
+    return pygame.font.SysFont(None, size)
+
+
+def merge_rects(rects):
+    """The rects with every overlapping group replaced by its bounding rect, so none of the results overlap."""
+    merged = []
+    for rect in rects:
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect = rect.union(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class Game:
+    """Window around a simulation.
+
+    ``hud`` picks the on-screen layout: "classic" (score/timer/length in a row,
+    Enter restarts after game over) or "v5" (stacked HUD with enemy target
+    info, o/i debug keys unless recording, any key quits after game over).
+
+    ``clock`` is the wall clock the fixed-timestep loop reads.  The game
+    itself only ever sees tick counts and the actions it is stepped with, so
+    a seeded simulation plays out the same whatever the clock does.
+
+    ``record_to`` saves a Recording of the game to that path when run()
+    returns.  ``actions`` replaces the keyboard with an iterable of per-tick
+    actions (Recording.actions() plays a recording back) and ``time_scale``
+    runs the simulation that many times faster than real time.
+
+    ``viewport`` is the window size in cells (by default the whole board,
+    up to MAX_VIEW_COLUMNS x MAX_VIEW_ROWS).  On bigger worlds the camera
+    jumps to recentre on the player's head whenever it nears the edge of the
+    view, and only what is inside the view is ever drawn.
+
+    F3 toggles a performance overlay with per-phase tick timings (see
+    instrumentation.py), attaching Instruments to the simulation if it has
+    none.
+    """
+
+    def __init__(self, simulation, hud="classic", clock=time.perf_counter, record_to=None, actions=None,
+                 time_scale=1.0, viewport=None):
+        self.sim = simulation
+        self.hud = hud
+        if viewport is None:
+            viewport = (min(simulation.grid_width, MAX_VIEW_COLUMNS), min(simulation.grid_height, MAX_VIEW_ROWS))
+        self.view_columns, self.view_rows = viewport
+        self.camera = self.camera_for(simulation.player.body[0]) # World cell shown in the window's top-left corner
+        self.record_to = record_to
+        self.recording = Recording.start(simulation) if record_to else None
+        self.actions = iter(actions) if actions is not None else None
+        self.time_scale = time_scale
+        self.window_width = self.view_columns * CELL_SIZE
+        self.window_height = self.view_rows * CELL_SIZE
+        pygame.init()
+        self.screen = pygame.display.set_mode((self.window_width, self.window_height))
+        pygame.display.set_caption("Serpentine")
+        self.clock = pygame.time.Clock()
+        self.wall_clock = clock
+        self.wall_time = clock() # Read once per frame by update()
+        self.lag = 0.0 # Wall-clock seconds not yet simulated
+        self.game_end_wall_time = None # Wall-clock time the game ended (v5 end message flash)
+        # What the window shows right now, so draw() only repaints changed cells
+        self.drawn_cells = None # {(x, y): layers} as last drawn; None forces a full repaint
+        self.drawn_tick = None
+        self.drawn_hud = []
+        self.drawn_hud_rects = []
+        self.text_surfaces = {} # (text, color, size) -> rendered HUD text
+        self.show_overlay = False
+        self.overlay_instruments = None # Instruments the overlay attached (and detaches again)
+        self.overlay = [] # Overlay HUD items as of overlay_tick
+        self.overlay_tick = None
+        self.sprites = {} # (shape, color) -> (pre-rendered cell sprite, offset)
+        # Empty board with its boundary; repainting a cell starts from its piece of this
+        self.background = pygame.Surface((self.window_width, self.window_height)).convert()
+        self.background.fill(BLACK)
+        pygame.draw.rect(self.background, WHITE, (0, 0, self.window_width, self.window_height), 2)
+
+    def read_action(self):
+        """First pressed arrow key that does not reverse the snake, else None."""
+        keys = pygame.key.get_pressed()
+        dx, dy = self.sim.direction
+        for key, direction in KEY_DIRECTIONS:
+            if keys[key] and direction != (-dx, -dy):
+                return direction
+        return None
+
+    def update(self):
+        """Run the ticks the wall clock owes the simulation (fixed timestep, rendering is separate).
+
+        Each frame adds the real time that passed (times ``time_scale``) to
+        ``lag`` and the simulation steps once per ``frame_time`` of it.  After a
+        stall it catches up at most MAX_CATCH_UP_TICKS per frame (scaled up
+        along with fast playback) and drops whatever is left beyond one tick,
+        so a simulation that cannot keep up slows down instead of owing more
+        and more ticks to every later frame.
+        """
+        current_time = self.wall_clock()
+        self.lag += (current_time - self.wall_time) * self.time_scale
+        self.wall_time = current_time
+        frame_time = self.sim.frame_time
+        max_steps = MAX_CATCH_UP_TICKS * max(1, math.ceil(self.time_scale))
+        steps = 0
+        while self.lag >= frame_time and steps < max_steps:
+            self.lag -= frame_time
+            steps += 1
+            if not self.sim.game_over:
+                self.step()
+        self.lag = min(self.lag, frame_time) # Time the catch-up could not use is dropped
+        if self.sim.game_over:
+            self.lag = 0.0 # Nothing left to simulate
+            if self.game_end_wall_time is None:
+                self.game_end_wall_time = current_time
+
+    def step(self):
+        """Step the simulation with the next keyboard or replayed action, recording it if asked to."""
+        if self.sim.instruments is not None:
+            self.sim.instruments.begin_tick(self.sim.tick + 1) # Count reading the input as part of the tick
+        with self.sim.phase("input"):
+            if self.actions is None:
+                action = self.read_action()
+            else:
+                action = next(self.actions, None)
+        if self.recording is not None:
+            self.recording.record(self.sim, action)
+        self.sim.step(action)
+
+    def camera_for(self, head):
+        """Camera that puts ``head`` in the middle of the view, kept inside the world."""
+        sim = self.sim
+        return (max(0, min(head.x - self.view_columns // 2, sim.grid_width - self.view_columns)),
+                max(0, min(head.y - self.view_rows // 2, sim.grid_height - self.view_rows)))
+
+    def follow_player(self):
+        """Move the camera if the player's head is near the edge of the view; a moved camera repaints everything."""
+        if not self.sim.player.body:
+            return
+        head = self.sim.player.body[0]
+        camera_x, camera_y = self.camera
+        margin_x = min(CAMERA_MARGIN, self.view_columns // 4)
+        margin_y = min(CAMERA_MARGIN, self.view_rows // 4)
+        if (camera_x + margin_x <= head.x < camera_x + self.view_columns - margin_x
+                and camera_y + margin_y <= head.y < camera_y + self.view_rows - margin_y):
+            return
+        camera = self.camera_for(head)
+        if camera != self.camera:
+            self.camera = camera
+            self.drawn_cells = None
+
+    def draw(self):
+        """Redraw what changed since the last frame and push only those rects to the display."""
+        self.follow_player()
+        sim = self.sim
+        if sim.game_over and self.game_end_wall_time is None: # Stepped by someone other than update()
+            self.game_end_wall_time = self.wall_time
+        hud = self.hud_items()
+        if self.drawn_cells is not None and sim.tick == self.drawn_tick and hud == self.drawn_hud:
+            return # Nothing moved and the HUD text is the same: the window is already right
+        cells = self.scene() if sim.tick != self.drawn_tick or self.drawn_cells is None else self.drawn_cells
+        hud_rects = [self.hud_rect(item) for item in hud]
+
+        dirty = None if self.drawn_cells is None else self.dirty_rects(cells, hud, hud_rects)
+        if dirty is None or sum(rect.w * rect.h for rect in dirty) > FULL_REPAINT_SHARE * self.window_width * self.window_height:
+            # First frame, or so much changed that one pass over the whole window is cheaper
+            layers = [(layer, cell) for cell, cell_layers in cells.items() for layer in cell_layers]
+            layers.sort(key=lambda entry: entry[0][0]) # Stable: snakes, food, then eggs, as they were always drawn
+            self.screen.fill(BLACK)
+            pygame.draw.rect(self.screen, WHITE, (0, 0, self.window_width, self.window_height), 2) # Boundary
+            blits = []
+            for (_, shape, color), (x, y) in layers:
+                sprite, offset = self.sprite(shape, color)
+                blits.append((sprite, (x * CELL_SIZE + offset, y * CELL_SIZE + offset)))
+            self.screen.blits(blits, doreturn=False)
+            for item, rect in zip(hud, hud_rects):
+                self.screen.blit(self.render_text(item), rect)
+            pygame.display.flip()
+        elif dirty:
+            blits = []
+            for rect in dirty:
+                self.repaint_rect(rect, cells, blits)
+            # Text goes over the cells, cut down to the dirty rects so the rest of a line is left alone
+            for item, hud_rect in zip(hud, hud_rects):
+                for rect in dirty:
+                    visible = hud_rect.clip(rect)
+                    if visible:
+                        blits.append((self.render_text(item), visible.topleft, visible.move(-hud_rect.x, -hud_rect.y)))
+            self.screen.blits(blits, doreturn=False)
+            pygame.display.update(dirty)
+        self.remember(cells, hud, hud_rects)
+
+    def dirty_rects(self, cells, hud, hud_rects):
+        """Disjoint window rects covering every pixel that differs from what was drawn last frame."""
+        old_cells = self.drawn_cells
+        rects = []
+        runs = {} # Row -> columns of changed cells that are plain rects
+        for x, y in cells.keys() | old_cells.keys():
+            new_layers = cells.get((x, y), ())
+            old_layers = old_cells.get((x, y), ())
+            if new_layers == old_layers or not (0 <= x < self.view_columns and 0 <= y < self.view_rows):
+                continue
+            if any(layer[1] == "circle" for layer in new_layers + old_layers):
+                # Egg circles spill a pixel into the cells around them
+                rects.append(pygame.Rect(x * CELL_SIZE - 1, y * CELL_SIZE - 1, CELL_SIZE + 2, CELL_SIZE + 2))
+            else:
+                runs.setdefault(y, []).append(x)
+        # Side-by-side cells in a row go to the display as one rect
+        for y, columns in runs.items():
+            columns.sort()
+            first = previous = columns[0]
+            for x in columns[1:] + [None]:
+                if x != previous + 1:
+                    rects.append(pygame.Rect(first * CELL_SIZE, y * CELL_SIZE, (previous - first + 1) * CELL_SIZE, CELL_SIZE))
+                    first = x
+                previous = x
+        # HUD text that went away, appeared or changed; unchanged lines stay as they are
+        rects.extend(rect for item, rect in zip(self.drawn_hud, self.drawn_hud_rects) if item not in hud)
+        rects.extend(rect for item, rect in zip(hud, hud_rects) if item not in self.drawn_hud)
+        window = self.screen.get_rect()
+        return merge_rects(rect.clip(window) for rect in rects)
+
+    def remember(self, cells, hud, hud_rects):
+        # Keep only the text still on screen; the timer alone would grow the cache every second
+        if len(self.text_surfaces) > len(hud):
+            keep = {item[:3] for item in hud}
+            self.text_surfaces = {key: surface for key, surface in self.text_surfaces.items() if key in keep}
+        self.drawn_cells = cells
+        self.drawn_tick = self.sim.tick
+        self.drawn_hud = hud
+        self.drawn_hud_rects = hud_rects
+
+    def scene(self):
+        """What every non-empty cell in view shows: {(x, y): ((depth, shape, color), ...)} in drawing order.
+
+        Cells are in window coordinates (world cell minus camera).  Depth is
+        the pass the shape belongs to (snakes, food, player eggs, enemy eggs):
+        shapes from a deeper pass are drawn over shallower ones.
+        """
+        sim = self.sim
+        camera_x, camera_y = self.camera
+        columns, rows = self.view_columns, self.view_rows
+        cells = {}
+
+        def show(point, layer):
+            x = point.x - camera_x
+            y = point.y - camera_y
+            if 0 <= x < columns and 0 <= y < rows:
+                cells.setdefault((x, y), []).append(layer)
+
+        # Player snake, then enemy snakes
+        for snake in (sim.player, *sim.enemies):
+            for i, seg in enumerate(snake.body):
+                show(seg, (0, "rect", snake.head_color if i == 0 else snake.color))
+        # Food
+        if sim.food:
+            show(sim.food, (1, "rect", YELLOW))
+        # Eggs - colored based on type: player eggs CYAN, enemy eggs PINK
+        for depth, eggs, color in ((2, sim.player_eggs, CYAN), (3, sim.enemy_eggs, PINK)):
+            for egg_obj in eggs:
+                show(egg_obj.get_point(), (depth, "circle", color))
+        return {cell: tuple(layers) for cell, layers in cells.items()}
+
+    def repaint_rect(self, rect, cells, blits):
+        """Queue the blits that paint a window rect from scratch, including egg circles spilling in from next door.
+
+        Every blit is cut down to the rect with its ``area`` rect, so disjoint
+        rects can be queued in any order and sent to the screen in one blits() call.
+        """
+        blits.append((self.background, rect.topleft, rect)) # Black, plus the boundary along the edges
+        left, right = rect.left // CELL_SIZE - 1, (rect.right - 1) // CELL_SIZE + 1
+        top, bottom = rect.top // CELL_SIZE - 1, (rect.bottom - 1) // CELL_SIZE + 1
+        layers = []
+        if (right - left + 1) * (bottom - top + 1) <= len(cells): # Look the rect's cells up
+            for y in range(top, bottom + 1):
+                for x in range(left, right + 1):
+                    layers.extend((layer, (x, y)) for layer in cells.get((x, y), ()))
+        else: # Fewer non-empty cells in the whole view than in the rect
+            for (x, y), cell_layers in cells.items():
+                if left <= x <= right and top <= y <= bottom:
+                    layers.extend((layer, (x, y)) for layer in cell_layers)
+        layers.sort(key=lambda entry: entry[0][0])
+        for (_, shape, color), (layer_x, layer_y) in layers:
+            sprite, offset = self.sprite(shape, color)
+            placed = sprite.get_rect(topleft=(layer_x * CELL_SIZE + offset, layer_y * CELL_SIZE + offset))
+            visible = placed.clip(rect)
+            if visible:
+                blits.append((sprite, visible.topleft, visible.move(-placed.x, -placed.y)))
+
+    def sprite(self, shape, color):
+        """Pre-rendered ``(surface, offset)`` for a cell shape; blit it at the cell's corner plus offset.
+
+        Circles come out one pixel wider than a cell on each side, so their
+        sprites carry a transparent margin and a -1 offset.
+        """
+        key = (shape, color)
+        if key not in self.sprites:
+            if shape == "rect":
+                sprite = pygame.Surface((CELL_SIZE, CELL_SIZE)).convert()
+                sprite.fill(color)
+                self.sprites[key] = (sprite, 0)
+            else:
+                sprite = pygame.Surface((CELL_SIZE + 2, CELL_SIZE + 2), pygame.SRCALPHA).convert_alpha()
+                sprite.fill((0, 0, 0, 0))
+                pygame.draw.circle(sprite, color, (int(CELL_SIZE / 2) + 1, int(CELL_SIZE / 2) + 1), int(CELL_SIZE / 2))
+                self.sprites[key] = (sprite, -1)
+        return self.sprites[key]
+
+    # --- HUD ---
+    # HUD entries are (text, color, font size, anchor, position) tuples, so a
+    # frame can tell whether anything on it changed without rendering text.
+
+    def render_text(self, item):
+        """Rendered surface for a HUD entry, rasterized only the first time its text, color and size show up."""
+        key = item[:3]
+        surface = self.text_surfaces.get(key)
+        if surface is None:
+            if len(self.text_surfaces) >= MAX_TEXT_SURFACES:
+                self.text_surfaces.clear()
+            text, color, size = key
+            surface = self.text_surfaces[key] = font(size).render(text, True, color)
+        return surface
+
+    def hud_rect(self, item):
+        _, _, _, anchor, position = item
+        return self.render_text(item).get_rect(**{anchor: position})
+
+    def hud_items(self):
+        items = self.v5_hud_items() if self.hud == "v5" else self.classic_hud_items()
+        if self.show_overlay:
+            items += self.overlay_items()
+        return items
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay and self.sim.instruments is None:
+            self.sim.instruments = self.overlay_instruments = Instruments(budget=self.sim.frame_time)
+        elif not self.show_overlay and self.sim.instruments is self.overlay_instruments:
+            self.sim.instruments = self.overlay_instruments = None
+        self.overlay_tick = None
+
+    def overlay_items(self):
+        """Performance overlay down the right edge: rolling tick and phase timings, v5 searches, the last slow tick."""
+        sim = self.sim
+        if sim.instruments is None:
+            return []
+        if self.overlay_tick is not None and 0 <= sim.tick - self.overlay_tick < OVERLAY_REFRESH_TICKS:
+            return self.overlay
+        self.overlay_tick = sim.tick
+        summary = sim.instruments.summary()
+        phases = summary["phases"]
+        lines = []
+        if "tick" in phases:
+            tick = phases["tick"]
+            lines.append(f"tick {tick['mean_ms']:.1f} ms, p95 {tick['p95_ms']:.1f} / {sim.frame_time * 1000:.0f} ms")
+        for name, stats in sorted(phases.items(), key=lambda entry: -entry[1]["mean_ms"]):
+            if name != "tick":
+                lines.append(f"{name} {stats['mean_ms']:.2f} ms, p95 {stats['p95_ms']:.2f}")
+        for enemy_index, stats in list(summary["searches"].items())[:8]:
+            lines.append(f"enemy {enemy_index + 1} search {stats['mean_ms']:.2f} ms, {stats['mean_expanded']:.0f} nodes")
+        if summary["slow_ticks"]:
+            tick, milliseconds, slowest = summary["slow_ticks"][-1]
+            lines.append(f"slow tick {tick}: {milliseconds:.0f} ms, mostly {slowest}")
+        self.overlay = [(line, CYAN, 20, "topright", (self.window_width - 10, 10 + 16 * row))
+                        for row, line in enumerate(lines)]
+        return self.overlay
+
+    def timer_string(self):
+        # Simulated time stops advancing at game over, which freezes the timer
+        elapsed_seconds = int(self.sim.now - self.sim.game_start_time)
+        minutes = elapsed_seconds // 60
+        seconds = elapsed_seconds % 60
+        return f"Time: {minutes:02}:{seconds:02}" # MM:SS format
+
+    def classic_hud_items(self):
+        sim = self.sim
+        items = [
+            (f"Score: {sim.score}", WHITE, 30, "topleft", (10, 10)),
+            (self.timer_string(), WHITE, 30, "topleft", (150, 10)), # Position timer next to score
+            (f"Length: {len(sim.player.body)}", WHITE, 30, "topleft", (300, 10)), # Position length next to timer
+        ]
+
+        # Game over or win screen
+        if sim.game_over:
+            color = RED if "Game Over" in sim.end_message else GREEN
+            items.append((sim.end_message, color, 40, "center", (self.window_width // 2, self.window_height // 2)))
+        return items
+
+    def v5_hud_items(self):
+        sim = self.sim
+        items = []
+        score_item = (f"Score: {sim.score}", WHITE, 30, "topleft", (10, 10))
+
+        y_offset = 70 # Start y position for enemy target info
+        for i, enemy in enumerate(sim.enemies):
+            if enemy.target: # Only display target if enemy has one
+                target_type_str = f" ({enemy.target_type})" if enemy.target_type else ""
+                items.append((f"Enemy {i+1} Target: {enemy.target.get_tuple()}{target_type_str}, Len: {len(enemy.body)}", WHITE, 30, "topleft", (10, y_offset)))
+                y_offset += 20 # Move y_offset down for next enemy's target
+
+        if not sim.game_over:
+            items.append((self.timer_string(), WHITE, 30, "topleft", (10, 30)))
+        else:
+            items.append((sim.end_message, WHITE, 30, "center", (self.window_width // 2, self.window_height // 2)))
+            if self.wall_time - self.game_end_wall_time < 3:
+                score_item = (sim.end_message, YELLOW, 30, "topleft", (10, 10))
+            else:
+                score_item = (sim.end_message, WHITE, 30, "topleft", (10, 10))
+
+        items.append((f"Length: {len(sim.player.body)}", WHITE, 30, "topleft", (10, 50)))
+        items.append(score_item)
+        return items
+
+    def handle_debug_key(self, key):
+        # Enemy snake length modification (v5 debug keys); off while recording, as replays could not repeat it
+        if self.recording is not None:
+            return
+        if key == pygame.K_o:
+            self.sim.grow_enemies(5)
+        elif key == pygame.K_i:
+            self.sim.shrink_enemies()
+        self.drawn_tick = None # Snakes changed between ticks
+
+    def run(self):
+        """Play until the window closes.
+
+        With the classic HUD, returns True if the player asked to restart.
+        The v5 HUD keeps its original's answers: False when a key closed the
+        game-over screen, True when the window was closed.
+        """
+        try:
+            return self.play()
+        finally:
+            if self.recording is not None:
+                self.recording.save(self.record_to)
+
+    def play(self):
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_F3:
+                        self.toggle_overlay()
+                    elif self.hud == "v5":
+                        if self.sim.game_over:
+                            return False
+                        self.handle_debug_key(event.key)
+                    elif self.sim.game_over and event.key == pygame.K_RETURN:
+                        return True  # Restart game
+
+            self.update()
+            with self.sim.phase("draw"):
+                self.draw()
+            self.clock.tick(60)  # 60 FPS
+
+        return self.hud == "v5" # Window closed
@@ -0,0 +1,264 @@
+"""Occupancy grid: what is on each cell, as flat arrays indexed by ``y * width + x``.
+
+Snakes keep their layer in sync on every head push, tail pop, growth and
+truncation, so "is anything on this cell" is an O(1) lookup instead of a
+scan over every body.  Layers hold segment counts rather than a single owner
+id because cells can be stacked: growth repeats the tail cell, and enemies
+are allowed to run over other bodies.
+
+Huge boards keep each layer in 32x32-cell chunks that exist only while
+something is on them (ChunkedLayer), so memory follows the snakes and eggs
+rather than the board area.  They are indexed by cell id just like the flat
+arrays, at the price of slower lookups, which is why smaller boards keep the
+arrays.
+
+The grid also keeps the set of free cells (nothing on them) so food can be
+placed in constant time however crowded the board is; snakes and eggs report
+every cell they take or leave through claim() and release().  The same two
+calls keep a flat board's obstacle flags up to date, so obstacle_flags() is
+a plain copy rather than a pass over every layer.
+"""
+from array import array
+
+from .model import Point
+
+# Obstacle flags in a snapshot from obstacle_flags()
+SNAKE = 1
+EGG = 2
+
+# Boards with more cells than this use chunked layers (the standard boards are far below it)
+CHUNKED_MIN_CELLS = 1 << 18
+CHUNK_SHIFT = 5
+CHUNK_MASK = (1 << CHUNK_SHIFT) - 1
+CHUNK_CELLS = 1 << 2 * CHUNK_SHIFT
+# Draws a chunked board's free-cell sampler makes before giving up for now
+PROBE_ATTEMPTS = 64
+
+
+def locate(cell, width, chunks_per_row):
+    """``(chunk index, offset in chunk)`` of a cell id on a chunked board."""
+    y, x = divmod(cell, width)
+    return ((y >> CHUNK_SHIFT) * chunks_per_row + (x >> CHUNK_SHIFT),
+            (y & CHUNK_MASK) << CHUNK_SHIFT | (x & CHUNK_MASK))
+
+
+class ChunkedLayer:
+    """One layer of counts per cell, stored as chunks that are dropped again once they are empty."""
+
+    def __init__(self, width, typecode):
+        self.width = width
+        self.chunks_per_row = (width + CHUNK_MASK) >> CHUNK_SHIFT
+        self.empty = array(typecode, bytes(array(typecode).itemsize * CHUNK_CELLS))  # Copied for new chunks, never written
+        self.chunks = {}  # Chunk index -> counts of its cells
+        self.population = {}  # Chunk index -> cells in it with a non-zero count
+
+    def __getitem__(self, cell):
+        key, offset = locate(cell, self.width, self.chunks_per_row)
+        chunk = self.chunks.get(key)
+        return chunk[offset] if chunk is not None else 0
+
+    def __setitem__(self, cell, value):
+        key, offset = locate(cell, self.width, self.chunks_per_row)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if not value:
+                return
+            chunk = self.chunks[key] = self.empty[:]
+            self.population[key] = 0
+        was_set = chunk[offset] != 0
+        chunk[offset] = value
+        if was_set != (value != 0):
+            population = self.population[key] + (-1 if was_set else 1)
+            if population:
+                self.population[key] = population
+            else:
+                del self.chunks[key]
+                del self.population[key]
+
+
+class ChunkedObstacles:
+    """obstacle_flags() of a chunked board: copies of the occupied chunks, read cell by cell.
+
+    Taking the snapshot costs a memory copy per occupied chunk.  Searches
+    that need the whole board as one buffer (JPS, distance fields, worker
+    processes) get it from bytes(), which does cost the full board area.
+    """
+
+    def __init__(self, grid):
+        self.width = grid.width
+        self.size = grid.width * grid.height
+        self.chunks_per_row = grid.player.chunks_per_row
+        self.chunks = {}  # Chunk index -> (player, enemies, eggs) counts
+        layers = (grid.player, grid.enemies, grid.eggs)
+        for key in grid.player.chunks.keys() | grid.enemies.chunks.keys() | grid.eggs.chunks.keys():
+            self.chunks[key] = tuple(layer.chunks[key][:] if key in layer.chunks else layer.empty for layer in layers)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, cell):
+        key, offset = locate(cell, self.width, self.chunks_per_row)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            return 0
+        player, enemies, eggs = chunk
+        return (SNAKE if player[offset] or enemies[offset] else 0) | (EGG if eggs[offset] else 0)
+
+    def __bytes__(self):
+        flags = bytearray(self.size)
+        for key, (player, enemies, eggs) in self.chunks.items():
+            chunk_y, chunk_x = divmod(key, self.chunks_per_row)
+            for offset in range(CHUNK_CELLS):
+                flag = (SNAKE if player[offset] or enemies[offset] else 0) | (EGG if eggs[offset] else 0)
+                if flag:
+                    y = chunk_y << CHUNK_SHIFT | offset >> CHUNK_SHIFT
+                    x = chunk_x << CHUNK_SHIFT | offset & CHUNK_MASK
+                    flags[y * self.width + x] = flag
+        return bytes(flags)
+
+
+class FreeCells:
+    """The free cells of a flat board, with O(1) updates and uniform sampling.
+
+    ``cells`` is a permutation of every cell id whose first ``count`` entries
+    are the free cells, and ``slots`` maps each cell back to its position, so
+    taking or freeing a cell is a single swap across the boundary.
+    """
+
+    def __init__(self, size):
+        self.cells = array("I", range(size))
+        self.slots = array("I", range(size))  # Cell -> its index in cells
+        self.count = size
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, cell):
+        return self.slots[cell] < self.count
+
+    def swap(self, cell, slot):
+        """Move ``cell`` to ``slot``, and whatever was there to where ``cell`` was."""
+        other = self.cells[slot]
+        old_slot = self.slots[cell]
+        self.cells[old_slot] = other
+        self.slots[other] = old_slot
+        self.cells[slot] = cell
+        self.slots[cell] = slot
+
+    def discard(self, cell):
+        if self.slots[cell] < self.count:
+            self.count -= 1
+            self.swap(cell, self.count)
+
+    def add(self, cell):
+        if self.slots[cell] >= self.count:
+            self.swap(cell, self.count)
+            self.count += 1
+
+    def sample(self, rng):
+        """A uniformly random free cell, or None when the board is full."""
+        return self.cells[rng.randrange(self.count)] if self.count else None
+
+
+class ProbedFreeCells:
+    """Free-cell sampling for chunked boards, where a dense list would cost the whole board area.
+
+    Snakes and eggs cover a tiny fraction of a board this size, so drawing
+    random cells until a free one turns up takes constant expected time.
+    After PROBE_ATTEMPTS misses sample() gives up and returns None, leaving
+    the caller to try again later.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.size = grid.width * grid.height
+
+    def discard(self, cell):
+        pass
+
+    def add(self, cell):
+        pass
+
+    def sample(self, rng):
+        grid = self.grid
+        for _ in range(PROBE_ATTEMPTS):
+            cell = rng.randrange(self.size)
+            if not (grid.player[cell] or grid.enemies[cell] or grid.eggs[cell]):
+                return cell
+        return None
+
+
+class OccupancyGrid:
+    def __init__(self, width, height, chunked=None):
+        self.width = width
+        self.height = height
+        size = width * height
+        self.chunked = size > CHUNKED_MIN_CELLS if chunked is None else chunked
+        if self.chunked:
+            self.player = ChunkedLayer(width, "H")
+            self.enemies = ChunkedLayer(width, "H")
+            self.eggs = ChunkedLayer(width, "B")
+        else:
+            self.player = array("H", bytes(2 * size))  # Player segments per cell
+            self.enemies = array("H", bytes(2 * size))  # Segments of all enemies per cell
+            self.eggs = bytearray(size)  # Eggs (player and enemy) per cell
+        self.flags = None if self.chunked else bytearray(size)  # SNAKE and/or EGG per cell, for obstacle_flags()
+        self.free = ProbedFreeCells(self) if self.chunked else FreeCells(size)
+        self.changes = None  # Cells whose contents changed, logged only once someone sets a list here
+
+    def cell(self, point):
+        return point.y * self.width + point.x
+
+    def is_free(self, point):
+        """True if no snake segment or egg is on the point."""
+        cell = point.y * self.width + point.x
+        return not (self.player[cell] or self.enemies[cell] or self.eggs[cell])
+
+    def claim(self, cell, flag=SNAKE):
+        """Something was put on the cell: a snake's first segment there, or (with ``flag`` EGG) an egg."""
+        self.free.discard(cell)
+        if self.flags is not None:
+            self.flags[cell] |= flag
+
+    def release(self, cell):
+        """Something left the cell; it rejoins the free cells if that was the last of it."""
+        snake = self.player[cell] or self.enemies[cell]
+        egg = self.eggs[cell]
+        if not (snake or egg):
+            self.free.add(cell)
+        if self.flags is not None:
+            self.flags[cell] = (SNAKE if snake else 0) | (EGG if egg else 0)
+
+    def random_free_point(self, rng):
+        """A uniformly random Point with nothing on it, or None if there is none to be had."""
+        cell = self.free.sample(rng)
+        if cell is None:
+            return None
+        y, x = divmod(cell, self.width)
+        return Point(x, y)
+
+    def add_egg(self, point):
+        cell = point.y * self.width + point.x
+        self.eggs[cell] += 1
+        self.claim(cell, EGG)
+        if self.changes is not None:
+            self.changes.append(cell)
+
+    def remove_egg(self, point):
+        cell = point.y * self.width + point.x
+        self.eggs[cell] -= 1
+        self.release(cell)
+        if self.changes is not None:
+            self.changes.append(cell)
+
+    def take_changes(self):
+        """Start (or continue) logging changed cells and return those logged since the last call."""
+        changes = self.changes or []
+        self.changes = []
+        return changes
+
+    def obstacle_flags(self):
+        """Snapshot of the board as one byte per cell: SNAKE and/or EGG bits (a ChunkedObstacles on chunked boards)."""
+        if self.chunked:
+            return ChunkedObstacles(self)
+        return bytes(self.flags)
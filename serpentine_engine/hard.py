@@ -0,0 +1,50 @@
+"""Hard rules (serpentine-hard.py): wider detection, tail chasing, stuck escape."""
+
+from .classic import ClassicSimulation
+from .model import GREEN
+
+
+class HardSimulation(ClassicSimulation):
+    grid_width = 80
+    grid_height = 60
+    detection_divisors = (2, 2)
+    tail_chase_range = 5
+    stuck_seconds = 20
+
+    def collide_enemies(self, enemies_to_remove):
+        # Collision with Enemies - body collision both ways and head-on fix
+        for i, enemy in enumerate(self.enemies):
+            # Ensure both snake bodies are not empty before accessing index 0 for head-on
+            if self.player.body and enemy.body:
+                if self.player.body[0] == enemy.body[0]: # Head-on collision
+                    if enemy.color == GREEN:
+                        enemies_to_remove.append(i)
+                        self.grew = True
+                        self.score += 50
+                    else:
+                        self.end_game(f"Game Over! Score: {self.score}")
+                        return False
+            # Enemy head collides with player body (Enemy eats Player)
+            if self.player.occupies_behind_head(enemy.body[0]):
+                if self.player.body[0] != enemy.body[0]: # To prevent duplicate processing of head-on
+                    original_player_length = len(self.player.body)
+                    collision_index = self.player.segment_index(enemy.body[0])
+                    removed_length = original_player_length - collision_index
+                    self.player.truncate(collision_index) # Player loses length from collision point onwards
+                    enemy.grow(removed_length) # Enemy gains the length
+                    self.grew = True # Player grew (due to length change, though visually shrinking)
+                    if len(enemy.body) <= 2: # Turn green if enemy length <= 2
+                        self.turn_green(enemy)
+                    break # Only process one body collision per tick
+
+            # Player head collides with enemy body (Player eats Enemy)
+            elif enemy.occupies_behind_head(self.player.body[0]):
+                original_enemy_length = len(enemy.body) # Store original enemy length
+                pos = enemy.segment_index(self.player.body[0])
+                enemy.truncate(pos)
+                removed_length = original_enemy_length - len(enemy.body) # Calculate removed length
+                self.player.grow(removed_length) # Player grows by removed length
+                self.grew = True
+                if len(enemy.body) <= 2: # Turn green if length is now 1 or 2
+                    self.turn_green(enemy)
+        return True
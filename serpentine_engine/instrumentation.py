@@ -0,0 +1,155 @@
+"""Per-phase timing of simulation ticks.
+
+Attach an Instruments to a simulation (``simulation.instruments =
+Instruments()``) and every tick records how long each phase of update()
+took, plus, in v5, the time and expanded nodes of every enemy's A*/JPS
+search.  Recent samples are kept in rolling windows for summary() (which
+the frontend shows as an overlay), and each tick can also be streamed as a
+JSON line or collected as Chrome trace events (open the file in
+chrome://tracing or Perfetto).  Without instruments update() only enters a
+shared no-op context per phase.
+"""
+import collections
+import json
+import threading
+import time
+
+# Histogram bucket upper bounds in milliseconds; the last bucket holds everything slower
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100)
+
+
+class _Phase:
+    """Reusable context manager timing one named phase."""
+
+    def __init__(self, instruments, name):
+        self.instruments = instruments
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.instruments.add(self.name, self.start, time.perf_counter())
+
+
+class Instruments:
+    """Rolling per-phase timings of the last ``window`` ticks, and optional JSON-lines / Chrome trace output.
+
+    ``budget`` is the time a tick may take (the simulation's frame_time);
+    slower ticks are remembered with their slowest phase.  ``jsonl`` is an
+    open text file that gets one line per tick.  With ``trace`` every phase
+    and search is kept as a trace event for write_chrome_trace(), so only
+    turn it on for bounded runs.
+    """
+
+    def __init__(self, window=600, budget=0.1, jsonl=None, trace=False):
+        self.window = window
+        self.budget = budget
+        self.jsonl = jsonl
+        self.trace_events = [] if trace else None
+        self.origin = time.perf_counter()  # Trace timestamps count from here
+        self.samples = {}  # Phase name -> recent durations in seconds
+        self.searches = collections.deque(maxlen=window)  # (enemy index, seconds, nodes expanded)
+        self.slow_ticks = collections.deque(maxlen=100)  # (tick, milliseconds, slowest phase)
+        self.phases = {}  # Phase name -> reusable _Phase
+        self.tick = None  # Tick being recorded, None between ticks
+        self.tick_start = 0.0
+        self.tick_phases = {}
+        self.tick_searches = []
+
+    def phase(self, name):
+        """Context manager that times the named phase."""
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = _Phase(self, name)
+        return phase
+
+    def add(self, name, start, end):
+        """Record a phase that ran from ``start`` to ``end`` (perf_counter seconds)."""
+        duration = end - start
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = collections.deque(maxlen=self.window)
+        samples.append(duration)
+        if self.tick is not None:
+            self.tick_phases[name] = self.tick_phases.get(name, 0.0) + duration
+        if self.trace_events is not None:
+            self.trace_event(name, start, duration, "phase")
+
+    def record_search(self, enemy_index, start, end, expanded):
+        """Record one enemy's path search; may be called from planner threads."""
+        duration = end - start
+        self.searches.append((enemy_index, duration, expanded))
+        if self.tick is not None:
+            self.tick_searches.append((enemy_index, duration, expanded))
+        if self.trace_events is not None:
+            self.trace_event(f"search enemy {enemy_index}", start, duration, "search", {"expanded": expanded})
+
+    def trace_event(self, name, start, duration, category, args=None):
+        event = {"name": name, "cat": category, "ph": "X", "pid": 1, "tid": threading.get_ident(),
+                 "ts": (start - self.origin) * 1e6, "dur": duration * 1e6}
+        if args:
+            event["args"] = args
+        self.trace_events.append(event)
+
+    def begin_tick(self, tick):
+        """Start recording ``tick``; a second call for the same tick is ignored."""
+        if tick == self.tick:
+            return
+        self.tick = tick
+        self.tick_start = time.perf_counter()
+        self.tick_phases = {}
+        self.tick_searches = []
+
+    def end_tick(self):
+        end = time.perf_counter()
+        tick = self.tick
+        self.tick = None
+        self.add("tick", self.tick_start, end)
+        total = end - self.tick_start
+        if total > self.budget:
+            slowest = max(self.tick_phases, key=self.tick_phases.get, default=None)
+            self.slow_ticks.append((tick, total * 1000, slowest))
+        if self.jsonl is not None:
+            record = {
+                "tick": tick,
+                "total_ms": total * 1000,
+                "phases": {name: seconds * 1000 for name, seconds in self.tick_phases.items()},
+            }
+            if self.tick_searches:
+                record["searches"] = [{"enemy": enemy_index, "ms": seconds * 1000, "expanded": expanded}
+                                      for enemy_index, seconds, expanded in self.tick_searches]
+            self.jsonl.write(json.dumps(record) + "\n")
+
+    # --- Reading the numbers ---
+
+    def summary(self):
+        """Rolling statistics per phase (milliseconds) and per enemy search, plus the recent over-budget ticks."""
+        phases = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            histogram = [0] * (len(BUCKETS_MS) + 1)
+            bucket = 0
+            for seconds in ordered:
+                while bucket < len(BUCKETS_MS) and seconds * 1000 > BUCKETS_MS[bucket]:
+                    bucket += 1
+                histogram[bucket] += 1
+            phases[name] = {
+                "count": len(ordered),
+                "mean_ms": sum(ordered) / len(ordered) * 1000,
+                "p95_ms": ordered[len(ordered) * 95 // 100] * 1000,
+                "max_ms": ordered[-1] * 1000,
+                "histogram": histogram,
+            }
+        enemies = {}
+        for enemy_index, seconds, expanded in list(self.searches):
+            count, total, nodes = enemies.get(enemy_index, (0, 0.0, 0))
+            enemies[enemy_index] = (count + 1, total + seconds, nodes + expanded)
+        searches = {enemy_index: {"count": count, "mean_ms": total / count * 1000, "mean_expanded": nodes / count}
+                    for enemy_index, (count, total, nodes) in sorted(enemies.items())}
+        return {"phases": phases, "searches": searches, "slow_ticks": list(self.slow_ticks)}
+
+    def write_chrome_trace(self, path):
+        with open(path, "w") as file:
+            json.dump({"traceEvents": self.trace_events or [], "displayTimeUnit": "ms"}, file)
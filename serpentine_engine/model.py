@@ -0,0 +1,176 @@
+"""Board objects shared by every ruleset: points, eggs, snakes and colors.
+
+Millions of these are made and compared per game, so they are kept small:
+a Point is a tuple (hashing and equality run in C) and Egg and Snake have
+``__slots__`` instead of a per-instance ``__dict__``.
+"""
+import collections
+
+# Colors - snakes carry their color as game state (green enemies can be eaten head-on)
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+BLUE = (0, 0, 255)
+LIGHT_BLUE = (173, 216, 230)  # Head color for player snake
+RED = (255, 0, 0)
+ORANGE = (255, 165, 0)      # Head color for enemy snakes
+GREEN = (0, 255, 0)
+YELLOW = (255, 255, 0)
+CYAN = (0, 255, 255)       # Player egg color
+PINK = (255, 192, 203)       # Enemy egg color
+
+
+# Point class to represent coordinates (an immutable (x, y) tuple, hashed like one)
+class Point(collections.namedtuple("Point", ["x", "y"])):
+    __slots__ = ()
+
+    def get_tuple(self): # Helper to get tuple representation
+        return (self.x, self.y)
+
+
+# Egg class to represent eggs with position and time laid
+class Egg:
+    __slots__ = ("point", "tick_laid", "egg_type")
+
+    def __init__(self, point, tick_laid, egg_type):
+        self.point = point
+        self.tick_laid = tick_laid
+        self.egg_type = egg_type # "player" or "enemy"
+
+    def get_point(self):
+        return self.point
+
+    def get_type(self):
+        return self.egg_type
+
+
+# Snake class to manage snake properties (superset of the fields every ruleset uses)
+class Snake:
+    __slots__ = ("body", "grid", "counts", "cells", "newest", "head_seq", "tail_seq", "color", "head_color",
+                 "original_color", "is_green", "last_move_tick", "move_interval", "serial", "last_head_position",
+                 "stuck_timer_start_tick", "last_head_move_tick", "target", "target_type", "stuck_clear_target")
+
+    def __init__(self, body, color, head_color, grid, counts):
+        self.body = collections.deque()  # Point objects, head first
+        self.cells = {}  # Cell index -> segments of this snake on that cell
+        self.newest = {}  # Cell index -> serial of the segment on that cell nearest the head
+        self.reset(body, color, head_color, grid, counts)
+
+    def reset(self, body, color, head_color, grid, counts):
+        """(Re)start the snake as a new one with ``body``, reusing its containers (see Simulation.new_enemy)."""
+        self.grid = grid  # OccupancyGrid kept in sync with every body change
+        self.counts = counts  # Grid layer this snake is counted in (grid.player or grid.enemies)
+        self.body.clear()
+        self.cells.clear()
+        self.newest.clear()
+        # Every segment gets a serial number: head pushes count up, tail growth counts down,
+        # so body[i] has serial head_seq - i and positions never need a list scan.
+        self.head_seq = 0
+        self.tail_seq = 1
+        for point in body:
+            self.body.append(point)
+            self.tail_seq -= 1
+            self.occupy_tail(point, 1)
+        self.color = color
+        self.head_color = head_color
+        self.original_color = color
+        self.is_green = False # Track if currently green
+        self.last_move_tick = 0 # For speed control
+        self.move_interval = 1 # Ticks between moves (the simulation sets it from seconds)
+        self.serial = 0 # Creation order among enemies (the simulation numbers them)
+        self.last_head_position = None # Track last head position for stuck detection
+        self.stuck_timer_start_tick = 0 # Tick the stuck timer started (hard rules)
+        self.last_head_move_tick = 0 # Tick the head last changed cell (v5 rules)
+        self.target = None  # Current target for the snake (Point or None)
+        self.target_type = None # Type of target ("food" or "egg" or "tail")
+        self.stuck_clear_target = False # Flag to indicate target should be cleared due to stuck
+
+    # --- Body changes (every one goes through these to keep the grid in sync) ---
+
+    def occupy_tail(self, point, segments):
+        cell = point.y * self.grid.width + point.x
+        if cell in self.cells:
+            self.cells[cell] += segments
+        else:
+            self.cells[cell] = segments
+            self.newest[cell] = self.tail_seq + segments - 1
+            self.grid.claim(cell)
+            if self.grid.changes is not None:
+                self.grid.changes.append(cell)
+        self.counts[cell] += segments
+
+    def vacate(self, point):
+        # Segments always leave from the tail end, so the newest serial on a cell goes last
+        cell = point.y * self.grid.width + point.x
+        remaining = self.cells[cell] - 1
+        self.counts[cell] -= 1
+        if remaining:
+            self.cells[cell] = remaining
+        else:
+            del self.cells[cell]
+            del self.newest[cell]
+            self.grid.release(cell)
+            if self.grid.changes is not None:
+                self.grid.changes.append(cell)
+
+    def push_head(self, point):
+        self.body.appendleft(point)
+        self.head_seq += 1
+        cell = point.y * self.grid.width + point.x
+        segments = self.cells.get(cell, 0)
+        if not segments:
+            self.grid.claim(cell)
+        self.cells[cell] = segments + 1
+        self.newest[cell] = self.head_seq
+        self.counts[cell] += 1
+        if self.grid.changes is not None:
+            self.grid.changes.append(cell)
+
+    def pop_tail(self):
+        point = self.body.pop()
+        self.tail_seq += 1
+        self.vacate(point)
+        return point
+
+    def grow(self, segments):
+        """Stack ``segments`` extra segments on the tail cell."""
+        tail = self.body[-1]
+        self.body.extend([tail] * segments)
+        self.tail_seq -= segments
+        self.occupy_tail(tail, segments)
+
+    def truncate(self, length):
+        """Cut the body down to its first ``length`` segments."""
+        while len(self.body) > length:
+            self.pop_tail()
+
+    def remove_from_grid(self):
+        for cell, count in self.cells.items():
+            self.counts[cell] -= count
+            self.grid.release(cell)
+        if self.grid.changes is not None:
+            self.grid.changes.extend(self.cells)
+        self.cells.clear()
+        self.newest.clear()
+
+    # --- O(1) membership ---
+
+    def count_at(self, point):
+        return self.cells.get(point.y * self.grid.width + point.x, 0)
+
+    def occupies(self, point):
+        """Same as ``point in body``."""
+        return point.y * self.grid.width + point.x in self.cells
+
+    def occupies_before_tail(self, point):
+        """Same as ``point in body[:-1]``."""
+        count = self.cells.get(point.y * self.grid.width + point.x, 0)
+        return count > (1 if self.body[-1] == point else 0)
+
+    def occupies_behind_head(self, point):
+        """Same as ``point in body[1:]``."""
+        count = self.cells.get(point.y * self.grid.width + point.x, 0)
+        return count > (1 if self.body[0] == point else 0)
+
+    def segment_index(self, point):
+        """Same as ``body.index(point)``: position of the first segment on the point."""
+        return self.head_seq - self.newest[point.y * self.grid.width + point.x]
@@ -0,0 +1,456 @@
+"""Grid searches over flat cell ids (``cell = y * width + x``).
+
+These functions take plain ints and byte buffers so they can run in any
+process: nothing here needs a Simulation, a Snake or a Point.  A* breaks
+ties between equal f-scores by cell id, which is the (y, x) order the
+original Point-based search used, so it returns the same paths.
+"""
+import functools
+import heapq
+from array import array
+
+try:
+    import numpy
+except ImportError:  # Optional: distance fields fall back to pure Python
+    numpy = None
+
+from .grid import SNAKE, EGG, CHUNKED_MIN_CELLS
+
+INFINITY = float("inf")
+
+
+def neighbor_table(width, height):
+    """Neighbours of every cell, Up, Down, Left, Right (the DIRECTIONS order), built once per grid size.
+
+    Huge (chunked) boards get a lookup that works them out per cell instead
+    of a table as big as the board.
+    """
+    if width * height > CHUNKED_MIN_CELLS:
+        return _NeighborLookup(width, height)
+    return _neighbor_table(width, height)
+
+
+@functools.lru_cache(maxsize=None)
+def _neighbor_table(width, height):
+    return tuple(tuple(_neighbors(width, height, cell)) for cell in range(width * height))
+
+
+class _NeighborLookup:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def __getitem__(self, cell):
+        return tuple(_neighbors(self.width, self.height, cell))
+
+
+def find_path(flags, width, height, start, goal, ignore_eggs=False, own_tail=-1, stats=None):
+    """A* from start to goal over a snapshot of obstacle flags.
+
+    ``flags`` holds one byte per cell (SNAKE | EGG bits).  Eggs are passable
+    when ``ignore_eggs`` is set and ``own_tail`` (the searching snake's tail
+    cell) is passable when it is not -1.  Returns the cells from start to
+    goal, or None if the goal is unreachable.  If ``stats`` is a dict, the
+    number of expanded nodes is stored in it under "expanded".
+    """
+    mask = SNAKE if ignore_eggs else SNAKE | EGG
+    neighbors = neighbor_table(width, height)
+    goal_x = goal % width
+    goal_y = goal // width
+
+    open_set = [(abs(start % width - goal_x) + abs(start // width - goal_y), start)]
+    came_from = {}
+    g_score = {start: 0}
+    f_score = {start: open_set[0][0]}
+    expanded = 0
+
+    while open_set:
+        current_f_score, current = heapq.heappop(open_set)
+
+        if current == goal:
+            if stats is not None:
+                stats["expanded"] = expanded
+            path = [current]
+            while current != start:
+                current = came_from[current]
+                path.append(current)
+            path.reverse()
+            return path
+
+        if current_f_score > f_score[current]: # Skip outdated entries in priority queue
+            continue
+        expanded += 1
+
+        tentative_g_score = g_score[current] + 1
+        for neighbor in neighbors[current]:
+            if flags[neighbor] & mask and (neighbor != own_tail or flags[neighbor] & mask & EGG):
+                continue
+            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                f_score[neighbor] = tentative_g_score + abs(neighbor % width - goal_x) + abs(neighbor // width - goal_y)
+                heapq.heappush(open_set, (f_score[neighbor], neighbor))
+
+    if stats is not None:
+        stats["expanded"] = expanded
+    return None
+
+
+def jump_point_search(flags, width, height, start, goal, ignore_eggs=False, own_tail=-1, stats=None):
+    """Jump Point Search for the 4-connected grid; same arguments and result as find_path().
+
+    Paths are canonical: vertical runs first, turning horizontal only where
+    the goal lies along the row or where an obstacle forces it.  Straight
+    runs are not queued cell by cell: horizontal scans are bytes.find() calls
+    over a 0/1 copy of the board, so on open boards only a handful of jump
+    points ever reach the heap.  Path lengths equal A*'s, but which of
+    several equally short paths comes back can differ.
+    """
+    blocked = bytes(flags).translate(_BLOCKED_EGG_FREE if ignore_eggs else _BLOCKED)
+    if own_tail >= 0 and blocked[own_tail] and not (flags[own_tail] & EGG and not ignore_eggs):
+        blocked = bytearray(blocked)
+        blocked[own_tail] = 0
+    goal_x = goal % width
+    goal_y = goal // width
+
+    def jump_horizontal(cell, dx):
+        """Next jump point from ``cell`` along its row (goal, or a cell with a forced turn), or -1."""
+        row = cell - cell % width
+        row_end = row + width
+        if dx > 0:
+            wall = blocked.find(1, cell + 1, row_end)
+            end = wall if wall >= 0 else row_end
+            best = goal if row == goal - goal_x and cell < goal < end else end
+            # Forced turn: the row above/below goes from blocked to open
+            for side in (row - width, row_end) if row else (row_end,):
+                if side + width <= len(blocked):
+                    hit = blocked.find(b"\1\0", cell - row + side, best - row + side)
+                    if hit >= 0:
+                        best = hit + 1 - side + row
+            return best if best < end else -1
+        wall = blocked.rfind(1, row, cell)
+        end = wall if wall >= 0 else row - 1
+        best = goal if row == goal - goal_x and end < goal < cell else end
+        for side in (row - width, row_end) if row else (row_end,):
+            if side + width <= len(blocked):
+                hit = blocked.rfind(b"\0\1", best + 1 - row + side, cell + 1 - row + side)
+                if hit >= 0:
+                    best = hit - side + row
+        return best if best > end else -1
+
+    def jump_vertical(cell, dy):
+        step = width * dy
+        while True:
+            cell += step
+            if not 0 <= cell < len(blocked) or blocked[cell]:
+                return -1
+            if cell == goal or jump_horizontal(cell, 1) >= 0 or jump_horizontal(cell, -1) >= 0:
+                return cell
+
+    def successors(cell, parent):
+        if parent < 0:
+            return jump_vertical(cell, -1), jump_vertical(cell, 1), jump_horizontal(cell, -1), jump_horizontal(cell, 1)
+        if parent % width == cell % width:  # Arrived vertically: keep going, or turn either way
+            return jump_vertical(cell, 1 if cell > parent else -1), jump_horizontal(cell, -1), jump_horizontal(cell, 1)
+        # Arrived horizontally: keep going, turning only where forced
+        dx = 1 if cell > parent else -1
+        jump_points = [jump_horizontal(cell, dx)]
+        for dy in (-1, 1):
+            side = cell + dy * width
+            if 0 <= side < len(blocked) and not blocked[side] and blocked[side - dx]:
+                jump_points.append(jump_vertical(cell, dy))
+        return jump_points
+
+    open_set = [(abs(start % width - goal_x) + abs(start // width - goal_y), start)]
+    came_from = {start: -1}
+    g_score = {start: 0}
+    f_score = {start: open_set[0][0]}
+    expanded = 0
+
+    while open_set:
+        current_f_score, current = heapq.heappop(open_set)
+
+        if current == goal:
+            if stats is not None:
+                stats["expanded"] = expanded
+            return _fill_path(came_from, current, width)
+
+        if current_f_score > f_score[current]: # Skip outdated entries in priority queue
+            continue
+        expanded += 1
+
+        for jump_point in successors(current, came_from[current]):
+            if jump_point < 0:
+                continue
+            tentative_g_score = (g_score[current] + abs(jump_point % width - current % width)
+                                 + abs(jump_point // width - current // width))
+            if jump_point not in g_score or tentative_g_score < g_score[jump_point]:
+                came_from[jump_point] = current
+                g_score[jump_point] = tentative_g_score
+                f_score[jump_point] = (tentative_g_score + abs(jump_point % width - goal_x)
+                                       + abs(jump_point // width - goal_y))
+                heapq.heappush(open_set, (f_score[jump_point], jump_point))
+
+    if stats is not None:
+        stats["expanded"] = expanded
+    return None
+
+
+# bytes.translate tables: obstacle flags -> 1 for blocked, 0 for open
+_BLOCKED = bytes(1 if flag & (SNAKE | EGG) else 0 for flag in range(256))
+_BLOCKED_EGG_FREE = bytes(1 if flag & SNAKE else 0 for flag in range(256))
+
+
+def _fill_path(came_from, current, width):
+    """Every cell along the straight runs between jump points, start first."""
+    path = [current]
+    parent = came_from[current]
+    while parent >= 0:
+        step = (1 if parent < current else -1) * (1 if parent // width == current // width else width)
+        while current != parent:
+            current -= step
+            path.append(current)
+        parent = came_from[current]
+    path.reverse()
+    return path
+
+
+SEARCHES = {"astar": find_path, "jps": jump_point_search}
+
+
+def next_step(flags, width, height, start, goal, ignore_eggs=False, own_tail=-1, search="astar"):
+    """The cell to move to next on the path from ``SEARCHES[search]``, or -1 if the goal is unreachable or already reached."""
+    path = SEARCHES[search](flags, width, height, start, goal, ignore_eggs, own_tail)
+    if path and len(path) > 1:
+        return path[1]
+    return -1
+
+
+class DStarLite:
+    """D* Lite towards one goal cell, repaired instead of re-searched as the board changes.
+
+    The search runs backwards from the goal, so ``g[cell]`` is the length of
+    the shortest known path from ``cell`` to the goal.  When the searching
+    snake moves or cells become blocked or free, only the affected part of
+    that tree is recomputed (Koenig & Likhachev, 2002).
+
+    ``blocked(cell)`` is read live; every answer is remembered in ``seen`` so
+    the caller can tell which changed cells the search actually depends on.
+    """
+
+    def __init__(self, width, height, start, goal, blocked):
+        self.width = width
+        self.height = height
+        self.start = start
+        self.last = start
+        self.goal = goal
+        self.blocked = blocked
+        self.km = 0
+        self.g = {}
+        self.rhs = {}
+        self.open_set = []
+        self.open_keys = {}
+        self.seen = {}
+        self.update_vertex(goal)  # A goal that starts out blocked starts out unreachable, as it is for A*
+
+    def heuristic(self, a, b):
+        width = self.width
+        return abs(a % width - b % width) + abs(a // width - b // width)
+
+    def neighbors(self, cell):
+        return _neighbors(self.width, self.height, cell)
+
+    def is_blocked(self, cell):
+        blocked = self.seen[cell] = bool(self.blocked(cell))
+        return blocked
+
+    def key(self, cell):
+        best = min(self.g.get(cell, INFINITY), self.rhs.get(cell, INFINITY))
+        return best + self.heuristic(self.start, cell) + self.km, best
+
+    def push(self, cell):
+        key = self.key(cell)
+        self.open_keys[cell] = key
+        heapq.heappush(self.open_set, (key, cell))
+
+    def update_vertex(self, cell):
+        if cell == self.goal:
+            self.rhs[cell] = INFINITY if self.is_blocked(cell) else 0
+        else:
+            g = self.g
+            best = INFINITY
+            for neighbor in self.neighbors(cell):
+                if not self.is_blocked(neighbor):
+                    best = min(best, g.get(neighbor, INFINITY) + 1)
+            self.rhs[cell] = best
+        if self.g.get(cell, INFINITY) != self.rhs[cell]:
+            self.push(cell)
+        else:
+            self.open_keys.pop(cell, None)
+
+    def cells_changed(self, cells):
+        """Repair the search after ``cells`` may have changed their blocked state."""
+        # Compare every cell before repairing any: the repairs refresh seen for the neighbours they read
+        seen = self.seen
+        flipped = [cell for cell in cells if cell in seen and seen[cell] != bool(self.blocked(cell))]
+        for cell in flipped:
+            self.update_vertex(cell)
+            for neighbor in self.neighbors(cell):
+                self.update_vertex(neighbor)
+
+    def move_start(self, start):
+        if start != self.start:
+            self.start = start
+            self.km += self.heuristic(self.last, start)
+            self.last = start
+
+    def compute_shortest_path(self):
+        open_set = self.open_set
+        open_keys = self.open_keys
+        g = self.g
+        rhs = self.rhs
+        start = self.start
+        while open_set:
+            key, cell = open_set[0]
+            if open_keys.get(cell) != key:  # Outdated entry
+                heapq.heappop(open_set)
+                continue
+            start_key = self.key(start)
+            if key >= start_key and rhs.get(start, INFINITY) == g.get(start, INFINITY):
+                break
+            new_key = self.key(cell)
+            if key < new_key:
+                self.push(cell)
+                continue
+            heapq.heappop(open_set)
+            del open_keys[cell]
+            if g.get(cell, INFINITY) > rhs.get(cell, INFINITY):
+                g[cell] = rhs[cell]
+                for neighbor in self.neighbors(cell):
+                    self.update_vertex(neighbor)
+            else:
+                g[cell] = INFINITY
+                self.update_vertex(cell)
+                for neighbor in self.neighbors(cell):
+                    self.update_vertex(neighbor)
+
+    def next_step(self):
+        """The neighbour of start on a shortest path to the goal, or -1 like next_step()."""
+        if self.start == self.goal:
+            return -1
+        self.compute_shortest_path()
+        best, best_cost = -1, INFINITY
+        for neighbor in self.neighbors(self.start):
+            if not self.is_blocked(neighbor):
+                cost = self.g.get(neighbor, INFINITY) + 1
+                if cost < best_cost:
+                    best, best_cost = neighbor, cost
+        return best
+
+
+def distance_field(flags, width, height, goal, ignore_eggs=False):
+    """Breadth-first distances from every cell to ``goal`` over a snapshot of obstacle flags.
+
+    One field answers the question for every snake chasing the same goal.
+    The goal is seeded even when something sits on it, since that is where
+    the snake wants to end up; blocked cells are never entered otherwise and
+    stay at -1 like cells that cannot reach the goal.  Uses NumPy when it is
+    installed; the result is indexed by cell id either way.
+    """
+    if numpy is not None:
+        return _distance_field_numpy(flags, width, height, goal, ignore_eggs)
+    return _distance_field_python(flags, width, height, goal, ignore_eggs)
+
+
+def _distance_field_numpy(flags, width, height, goal, ignore_eggs):
+    """Wavefront expansion: each ring is the previous one shifted four ways, minus walls and visited cells.
+
+    Works on a flat copy of the board padded with a closed row above and
+    below and a closed column after each row, so shifting by one cell or one
+    row never wraps around an edge.
+    """
+    mask = SNAKE if ignore_eggs else SNAKE | EGG
+    stride = width + 1
+    open_cells = numpy.zeros(stride * (height + 2), dtype=bool)
+    board = open_cells[stride:stride * (height + 1)].reshape(height, stride)[:, :width]
+    board[...] = (numpy.frombuffer(flags, dtype=numpy.uint8, count=width * height) & mask).reshape(height, width) == 0
+    field = numpy.full(open_cells.shape, -1, dtype=numpy.int32)
+    seed = stride * (goal // width + 1) + goal % width
+    field[seed] = 0
+    open_cells[seed] = False
+    frontier = numpy.zeros_like(open_cells)
+    frontier[seed] = True
+    ring = numpy.empty_like(open_cells)
+    distance = 0
+    while True:
+        distance += 1
+        ring[...] = False
+        ring[stride:] |= frontier[:-stride]
+        ring[:-stride] |= frontier[stride:]
+        ring[1:] |= frontier[:-1]
+        ring[:-1] |= frontier[1:]
+        ring &= open_cells
+        if not ring.any():
+            break
+        numpy.copyto(field, distance, where=ring)
+        open_cells &= ~ring
+        frontier, ring = ring, frontier
+    return field[stride:stride * (height + 1)].reshape(height, stride)[:, :width].ravel()
+
+
+def _distance_field_python(flags, width, height, goal, ignore_eggs):
+    mask = SNAKE if ignore_eggs else SNAKE | EGG
+    field = array("i", [-1]) * (width * height)
+    field[goal] = 0
+    frontier = [goal]
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for current in frontier:
+            x = current % width
+            y = current // width
+            for neighbor, inside in ((current - width, y > 0), (current + width, y < height - 1),
+                                     (current - 1, x > 0), (current + 1, x < width - 1)):
+                if inside and field[neighbor] < 0 and not flags[neighbor] & mask:
+                    field[neighbor] = distance
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return field
+
+
+def downhill(field, width, height, start, own_tail=-1):
+    """Best first step from ``start`` in a distance field.
+
+    Returns ``(next_cell, length)`` where ``length`` is the number of moves
+    to the goal; ``(-1, 0)`` when start is the goal and ``(-1, -1)`` when it
+    cannot be reached.  ``own_tail`` is a cell the snake may also step onto
+    (its own tail) even though the field treats it as blocked; unlike in
+    next_step() it is only usable as the first step, never further along.  Neighbours
+    are tried in DIRECTIONS order, so the first shortest one wins.
+    """
+    if field[start] == 0:
+        return -1, 0
+    best, best_length = -1, -1
+    for neighbor in _neighbors(width, height, start):
+        length = field[neighbor]
+        if length < 0 and neighbor == own_tail:
+            reachable = [field[cell] for cell in _neighbors(width, height, own_tail) if field[cell] >= 0]
+            length = min(reachable) + 1 if reachable else -1
+        if length >= 0 and (best_length < 0 or length + 1 < best_length):
+            best, best_length = neighbor, length + 1
+    return best, best_length
+
+
+def _neighbors(width, height, cell):
+    """Up, Down, Left, Right - the same order as DIRECTIONS."""
+    x = cell % width
+    y = cell // width
+    if y > 0:
+        yield cell - width
+    if y < height - 1:
+        yield cell + width
+    if x > 0:
+        yield cell - 1
+    if x < width - 1:
+        yield cell + 1
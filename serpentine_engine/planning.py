@@ -0,0 +1,270 @@
+"""Where enemy moves get planned.
+
+A planner takes a batch of enemy indices and returns one future per enemy,
+each resolving to the next cell for that enemy (or None when it has no
+path).  Simulations call ``planner.plan_moves(simulation, enemy_indices)``
+once per tick instead of starting a thread per enemy.
+"""
+import concurrent.futures
+from multiprocessing import shared_memory
+
+from .model import Point
+from .pathfinding import DStarLite, distance_field, downhill, next_step
+
+
+class InlinePlanner:
+    """Plans on the calling thread and hands back already-completed futures.
+
+    Cheapest option for headless runs: under the GIL extra threads only add
+    hand-off cost to pure-Python searches.
+    """
+
+    def plan_moves(self, simulation, enemy_indices):
+        futures = []
+        for enemy_index in enemy_indices:
+            future = concurrent.futures.Future()
+            try:
+                future.set_result(simulation.plan_move(enemy_index))
+            except Exception as exc:
+                future.set_exception(exc)
+            futures.append(future)
+        return futures
+
+    def shutdown(self):
+        pass
+
+
+class ThreadPlanner:
+    """Long-lived worker threads shared by every game in the process."""
+
+    def __init__(self, max_workers=4):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers, thread_name_prefix="serpentine-ai")
+
+    def plan_moves(self, simulation, enemy_indices):
+        return [self.executor.submit(simulation.plan_move, enemy_index) for enemy_index in enemy_indices]
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+
+class IncrementalPlanner:
+    """Keeps one D* Lite search per enemy and repairs it every tick.
+
+    Between ticks only a few cells change (heads, tails, eggs), so instead of
+    a fresh A* the planner feeds the cells the grid logged since the last call
+    into each enemy's search.  A search starts over when its enemy changes
+    target.  Paths have the same length as A* but equally short ones may be
+    picked differently, so games are not move-for-move identical to the
+    other planners.
+    """
+
+    def __init__(self):
+        self.simulation = None
+        self.searches = {}  # Enemy serial -> (search, ignore_eggs, own_tail, pending cells)
+
+    def plan_moves(self, simulation, enemy_indices):
+        if simulation is not self.simulation:
+            self.simulation = simulation
+            self.searches = {}
+            simulation.grid.take_changes()
+        changed = simulation.grid.take_changes()
+        alive = {enemy.serial for enemy in simulation.enemies}  # Serials, as dead Snake objects get reused
+        for serial in list(self.searches):
+            if serial in alive:
+                self.searches[serial][3].update(changed)
+            else:
+                del self.searches[serial]
+
+        futures = []
+        for enemy_index in enemy_indices:
+            future = concurrent.futures.Future()
+            try:
+                future.set_result(self.plan_move(simulation, enemy_index))
+            except Exception as exc:
+                future.set_exception(exc)
+            futures.append(future)
+        return futures
+
+    def plan_move(self, simulation, enemy_index):
+        enemy = simulation.enemies[enemy_index]
+        request = simulation.path_request(enemy_index)
+        if request is None:
+            self.searches.pop(enemy.serial, None)
+            return None
+        start, goal, ignore_eggs, own_tail = request
+        grid = simulation.grid
+        state = self.searches.get(enemy.serial)
+        if state is None or state[0].goal != goal or state[1] != ignore_eggs:
+            search = DStarLite(grid.width, grid.height, start, goal, _blocked(grid, ignore_eggs, own_tail))
+            pending = set()
+        else:
+            search, _, old_tail, pending = state
+            pending.update((old_tail, own_tail))
+            pending.discard(-1)
+            search.blocked = _blocked(grid, ignore_eggs, own_tail)
+            search.move_start(start)
+            search.cells_changed(pending)
+            pending.clear()
+        self.searches[enemy.serial] = (search, ignore_eggs, own_tail, pending)
+        cell = search.next_step()
+        return Point(cell % grid.width, cell // grid.width) if cell >= 0 else None
+
+    def shutdown(self):
+        self.simulation = None
+        self.searches = {}
+
+
+def _blocked(grid, ignore_eggs, own_tail):
+    """Live obstacle test matching next_step() on a snapshot of ``grid``."""
+    player, enemies, eggs = grid.player, grid.enemies, grid.eggs
+
+    def blocked(cell):
+        return ((player[cell] or enemies[cell]) and cell != own_tail) or (eggs[cell] and not ignore_eggs)
+    return blocked
+
+
+class FieldPlanner:
+    """One breadth-first distance field per distinct target per tick, shared by every enemy chasing it.
+
+    Most due enemies chase the same food, so instead of an A* per enemy the
+    board is flooded once from each target and every enemy steps downhill
+    from its head.  The fields also give true path lengths, which replace
+    Manhattan distance when enemies pick their targets: a target behind a
+    wall of snakes is no longer the "closest" one.  Games therefore differ
+    from the other planners.
+    """
+
+    def plan_moves(self, simulation, enemy_indices):
+        grid = simulation.grid
+        width, height = grid.width, grid.height
+        flags = bytes(simulation.obstacles)  # Floods need the whole board; free unless it is chunked
+        fields = {}
+
+        def field(goal, ignore_eggs):
+            key = (goal, ignore_eggs)
+            if key not in fields:
+                fields[key] = distance_field(flags, width, height, goal, ignore_eggs)
+            return fields[key]
+
+        futures = []
+        for enemy_index in enemy_indices:
+            future = concurrent.futures.Future()
+            try:
+                enemy = simulation.enemies[enemy_index]
+                start = grid.cell(enemy.body[0])
+                own_tail = simulation.own_tail_cell(enemy)
+
+                def distance(point, target_type):
+                    _, length = downhill(field(grid.cell(point), target_type == "egg"), width, height, start, own_tail)
+                    return length if length >= 0 else None
+
+                request = simulation.path_request(enemy_index, distance)
+                next_point = None
+                if request is not None:
+                    _, goal, ignore_eggs, _ = request
+                    cell, _ = downhill(field(goal, ignore_eggs), width, height, start, own_tail)
+                    if cell >= 0:
+                        next_point = Point(cell % width, cell // width)
+                future.set_result(next_point)
+            except Exception as exc:
+                future.set_exception(exc)
+            futures.append(future)
+        return futures
+
+    def shutdown(self):
+        pass
+
+
+_default_planner = None
+
+
+def default_planner():
+    """The process-wide ThreadPlanner, created on first use."""
+    global _default_planner
+    if _default_planner is None:
+        _default_planner = ThreadPlanner()
+    return _default_planner
+
+
+class ProcessPlanner:
+    """A* for every due enemy in parallel worker processes.
+
+    Each tick the obstacle grid is published once into shared memory; the
+    workers search it there and send back only the next cell of each enemy.
+    Target selection stays in this process because it updates the enemies.
+    """
+
+    def __init__(self, max_workers=None):
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers)
+        self.shared = None
+        self.shared_cells = 0  # Board size the block was made for (the block itself may be rounded up)
+
+    def publish(self, flags):
+        flags = bytes(flags)  # A chunked board's snapshot is written out in full
+        if self.shared is None or self.shared_cells != len(flags):  # New board size
+            self.release_shared()
+            self.shared = shared_memory.SharedMemory(create=True, size=len(flags))
+            self.shared_cells = len(flags)
+        self.shared.buf[:len(flags)] = flags
+
+    def plan_moves(self, simulation, enemy_indices):
+        if not enemy_indices:
+            return []
+        grid = simulation.grid
+        self.publish(simulation.obstacles)
+        futures = []
+        for enemy_index in enemy_indices:
+            request = simulation.path_request(enemy_index)
+            if request is None:
+                future = concurrent.futures.Future()
+                future.set_result(None)
+            else:
+                future = self.executor.submit(_next_step_in_worker, self.shared.name, grid.width, grid.height,
+                                              *request, simulation.search)
+                future = _as_point(future, grid.width)
+            futures.append(future)
+        return futures
+
+    def release_shared(self):
+        if self.shared is not None:
+            self.shared.close()
+            self.shared.unlink()
+            self.shared = None
+
+    def shutdown(self):
+        self.executor.shutdown()
+        self.release_shared()
+
+
+def _as_point(cell_future, width):
+    """Future for the Point of a future cell id (None for -1)."""
+    future = concurrent.futures.Future()
+
+    def done(finished):
+        try:
+            cell = finished.result()
+        except Exception as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(Point(cell % width, cell // width) if cell >= 0 else None)
+
+    cell_future.add_done_callback(done)
+    return future
+
+
+_attached = None  # Worker-side view of the published grid
+
+
+def _next_step_in_worker(name, width, height, start, goal, ignore_eggs, own_tail, search):
+    global _attached
+    if _attached is None or _attached.name != name:
+        if _attached is not None:
+            _attached.close()
+        _attached = shared_memory.SharedMemory(name=name)
+    # Some platforms round the block up, so only the first width * height bytes are the board
+    return next_step(_attached.buf[:width * height], width, height, start, goal, ignore_eggs, own_tail, search)
+
+
+# Planner name (as used by the headless runner and replay files) -> class
+PLANNERS = {"inline": InlinePlanner, "threads": ThreadPlanner, "processes": ProcessPlanner,
+            "incremental": IncrementalPlanner, "fields": FieldPlanner}
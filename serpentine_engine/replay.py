@@ -0,0 +1,160 @@
+"""Compact game recordings and their playback.
+
+A simulation is fully determined by its seed and the actions it is stepped
+with, provided nothing else changes it between steps, and the only action
+that matters on a tick is a change of the player's direction.  A recording
+therefore stores a small header and one entry per direction change, so a
+five-minute game fits in a few hundred bytes and plays back identically,
+headless at full speed or in the window.  Calls such as v5's
+grow_enemies() are not recorded, which is why the window turns off the
+debug keys that make them while it records.
+
+File layout (little-endian)::
+
+    b"SRPR", version (uint8)
+    grid width, grid height (uint16), frame_time (float64), seed (int64), ticks (uint32)
+    ruleset, planner, search: uint8 length + ASCII each ("" where not used)
+    per direction change: varint of (ticks since the previous change << 2 | direction index)
+"""
+import struct
+
+from .planning import PLANNERS
+from .simulation import DIRECTIONS
+
+MAGIC = b"SRPR"
+VERSION = 3  # 2: food is drawn from the free-cell set (grid.FreeCells); 3: v5 enemy start positions fixed
+_HEADER = struct.Struct("<4sBHHdqI")
+
+
+class Recording:
+    """Header of a recorded game plus its direction changes as (tick, direction) pairs."""
+
+    def __init__(self, ruleset, width, height, seed, frame_time=0.1, planner="", search="", ticks=0, changes=None):
+        self.ruleset = ruleset
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.frame_time = frame_time
+        self.planner = planner  # Planner name (v5 only); "incremental" and "fields" play differently
+        self.search = search  # Path search (v5 only)
+        self.ticks = ticks  # Ticks the game ran for
+        self.changes = changes if changes is not None else []
+
+    @classmethod
+    def start(cls, simulation):
+        """Empty recording for a simulation that has not been stepped yet."""
+        from . import RULESETS  # The package imports this module before it defines RULESETS
+        if simulation.seed is None:
+            raise ValueError("only a simulation built from a seed can be recorded")
+        if simulation.tick:
+            raise ValueError("a recording has to start at tick 0")
+        ruleset = next(name for name, ruleset_class in RULESETS.items() if type(simulation) is ruleset_class)
+        planner = ""
+        if hasattr(simulation, "planner"):
+            planner = next((name for name, planner_class in PLANNERS.items()
+                            if type(simulation.planner) is planner_class), "")
+        return cls(ruleset, simulation.grid_width, simulation.grid_height, simulation.seed, simulation.frame_time,
+                   planner, getattr(simulation, "search", ""))
+
+    def record(self, simulation, action):
+        """Note the action the simulation is about to be stepped with (call before step())."""
+        if simulation.game_over:
+            return
+        tick = simulation.tick + 1
+        direction = simulation.resolve_direction(action)
+        if direction != simulation.direction:
+            self.changes.append((tick, direction))
+        self.ticks = tick
+
+    # --- Playback ---
+
+    def simulation(self, planner=None):
+        """A fresh simulation set up like the recorded one (``planner`` overrides the recorded planner)."""
+        from . import RULESETS
+        simulation_class = RULESETS[self.ruleset]
+        options = {}
+        if self.search:
+            options["search"] = self.search
+        if planner is not None:
+            options["planner"] = planner
+        elif self.planner:
+            options["planner"] = PLANNERS[self.planner]()
+        return simulation_class(self.width, self.height, self.frame_time, seed=self.seed, **options)
+
+    def actions(self):
+        """The action for every recorded tick in order: a direction on ticks where it changed, else None."""
+        tick = 0
+        for change_tick, direction in self.changes:
+            while tick + 1 < change_tick:
+                tick += 1
+                yield None
+            tick += 1
+            yield direction
+        while tick < self.ticks:
+            tick += 1
+            yield None
+
+    def play(self, simulation=None):
+        """Replay headless as fast as possible; returns the last StepResult."""
+        if simulation is None:
+            simulation = self.simulation()
+        result = simulation.result()
+        for action in self.actions():
+            result = simulation.step(action)
+        return result
+
+    # --- Encoding ---
+
+    def to_bytes(self):
+        data = bytearray(_HEADER.pack(MAGIC, VERSION, self.width, self.height, self.frame_time, self.seed, self.ticks))
+        for text in (self.ruleset, self.planner, self.search):
+            encoded = text.encode("ascii")
+            data.append(len(encoded))
+            data += encoded
+        previous = 0
+        for tick, direction in self.changes:
+            value = (tick - previous) << 2 | DIRECTIONS.index(direction)
+            previous = tick
+            while value >= 0x80:
+                data.append(value & 0x7F | 0x80)
+                value >>= 7
+            data.append(value)
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, width, height, frame_time, seed, ticks = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a serpentine recording")
+        if version != VERSION:
+            raise ValueError(f"unsupported recording version {version}")
+        position = _HEADER.size
+        texts = []
+        for _ in range(3):
+            length = data[position]
+            texts.append(bytes(data[position + 1:position + 1 + length]).decode("ascii"))
+            position += 1 + length
+        ruleset, planner, search = texts
+
+        changes = []
+        tick = 0
+        value = shift = 0
+        for byte in data[position:]:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                tick += value >> 2
+                changes.append((tick, DIRECTIONS[value & 3]))
+                value = shift = 0
+        if shift:
+            raise ValueError("recording is truncated")
+        return cls(ruleset, width, height, seed, frame_time, planner, search, ticks, changes)
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
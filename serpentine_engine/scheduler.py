@@ -0,0 +1,76 @@
+"""Timed events keyed by the tick they are due on.
+
+The rules are full of "N seconds after X" timers: eggs hatch, snakes lay,
+food respawns and every enemy moves on its own cadence.  Rather than
+comparing every timer against the clock on every tick, each one is put in
+a Schedule under the tick it is due, and a phase of the tick only takes the
+events that have come due, so the cost follows the events that fire rather
+than the number of eggs and enemies waiting.
+
+Events live in channels (one per kind of timer, since each is handled by its
+own phase of the tick).  In a channel every key (an egg, a snake, or None
+for a single game-wide timer) has at most one pending due tick; setting it
+again moves the event, and cancel() drops it.
+"""
+import heapq
+
+
+class _Channel:
+    def __init__(self):
+        self.buckets = {}  # Due tick -> [(sequence, key)] in the order they were set
+        self.dues = []  # Heap of the due ticks that have a bucket
+        self.pending = {}  # Key -> sequence of its live entry; older entries for the key are stale
+
+
+class Schedule:
+    """Channels of events, each a timing wheel of per-tick buckets plus a heap of the occupied ticks.
+
+    Moving or cancelling an event leaves its old entry behind to be skipped
+    when its tick comes round, so every operation is O(1) apart from the
+    heap of distinct due ticks, which stays small because most events fall
+    on the next few ticks.
+    """
+
+    def __init__(self):
+        self.channels = {}
+        self.sequence = 0
+
+    def channel(self, name):
+        channel = self.channels.get(name)
+        if channel is None:
+            channel = self.channels[name] = _Channel()
+        return channel
+
+    def set(self, name, key, due):
+        """Make ``key``'s event in channel ``name`` due on tick ``due`` (replacing any earlier one)."""
+        channel = self.channel(name)
+        self.sequence += 1
+        channel.pending[key] = self.sequence
+        bucket = channel.buckets.get(due)
+        if bucket is None:
+            bucket = channel.buckets[due] = []
+            heapq.heappush(channel.dues, due)
+        bucket.append((self.sequence, key))
+
+    def cancel(self, name, key):
+        channel = self.channels.get(name)
+        if channel is not None:
+            channel.pending.pop(key, None)
+
+    def is_set(self, name, key):
+        channel = self.channels.get(name)
+        return channel is not None and key in channel.pending
+
+    def pop_due(self, name, tick):
+        """Remove and return the keys in channel ``name`` due on or before ``tick``, earliest (then first set) first."""
+        channel = self.channels.get(name)
+        if channel is None or not channel.dues or channel.dues[0] > tick:
+            return []
+        keys = []
+        pending = channel.pending
+        while channel.dues and channel.dues[0] <= tick:
+            for sequence, key in channel.buckets.pop(heapq.heappop(channel.dues)):
+                if pending.get(key) == sequence:
+                    del pending[key]
+                    keys.append(key)
+        return keys
@@ -0,0 +1,437 @@
+"""Display-free simulation core.
+
+A Simulation owns the whole board and advances it one tick per step(action)
+call.  Nothing here touches pygame or the wall clock: time is the integer
+tick count, and every duration in the rules (move cadences, egg and food
+timers) is written in seconds and turned into whole ticks with ticks().
+A headless box can run as many ticks per second as the CPU allows, and a
+frontend only has to call step() at its own pace and draw the result.
+
+All randomness comes from the simulation's own ``rng`` (a ``random.Random``),
+never the global ``random`` module.  Built with a ``seed`` (or a given rng),
+the same sequence of step() actions replays the exact same game; without
+either a fresh seed is drawn and kept in ``seed``, so any game can be
+recorded (see replay.py).
+
+Timers (egg hatching, laying, food respawn and each enemy's move cadence)
+are events in ``schedule`` (see scheduler.py), so a tick only does work for
+the timers that are due.
+"""
+import collections
+import contextlib
+import math
+import random
+
+from .grid import OccupancyGrid
+from .model import Point, Egg, Snake, BLUE, LIGHT_BLUE, RED, ORANGE, GREEN
+from .scheduler import Schedule
+from .spatial import EggIndex
+
+# Directions
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+
+# Schedule channels
+MOVE = "move"  # Key: enemy Snake
+HATCH = "hatch"  # Key: (egg index, Egg)
+FOOD = "food"  # Key: None
+PLAYER_EGG = "player egg"  # Key: None
+ENEMY_EGGS = "enemy eggs"  # Key: None
+
+# Shared stand-in for Instruments.phase() when nothing is being measured
+NO_PHASE = contextlib.nullcontext()
+
+# What step() hands back after every tick
+StepResult = collections.namedtuple(
+    "StepResult",
+    ["tick", "now", "score", "game_over", "end_message", "player_length", "enemy_count"],
+)
+
+
+class Simulation:
+    """Rules shared by every ruleset; subclasses override the phases that differ.
+
+    The class attributes below are the rule profile: the board size, timers
+    and ranges a ruleset tunes without rewriting a phase.  rule_profile()
+    lists them for a ruleset.
+    """
+
+    grid_width = 40
+    grid_height = 30
+    hatch_seconds = 10  # Eggs hatch this long after they were laid
+    food_seconds = 5  # New food appears this long after the last one did (once that is eaten)
+    player_egg_seconds = 10  # Between the player's egg laying attempts
+    enemy_egg_seconds = 30  # Between enemy egg layings
+    last_enemy_egg_seconds = 15  # The same once a single enemy is left
+    enemy_move_seconds = 0.1  # Between the moves of a normal enemy
+    green_move_seconds = 0.2  # Between the moves of a green enemy
+    stuck_seconds = None  # How long an enemy's head can stay on one cell before it breaks free (None: never)
+
+    # Names of the rule profile settings, in the order rule_profile() lists them
+    RULE_SETTINGS = ("grid_width", "grid_height", "hatch_seconds", "food_seconds", "player_egg_seconds",
+                     "enemy_egg_seconds", "last_enemy_egg_seconds", "enemy_move_seconds", "green_move_seconds",
+                     "stuck_seconds")
+
+    def __init__(self, grid_width=None, grid_height=None, frame_time=0.1, seed=None, rng=None):
+        if grid_width is not None:
+            self.grid_width = grid_width
+        if grid_height is not None:
+            self.grid_height = grid_height
+        self.frame_time = frame_time  # Simulated seconds per tick
+        if seed is None and rng is None:
+            seed = random.randrange(1 << 63)
+        self.seed = seed  # None only when the caller supplied its own rng
+        self.rng = rng if rng is not None else random.Random(seed)  # Every random choice in the rules
+        self.instruments = None  # instrumentation.Instruments timing each phase, when attached
+        self.tick = 0
+        self.now = 0.0  # Simulated seconds (tick * frame_time), for display
+        self.grid = OccupancyGrid(self.grid_width, self.grid_height)
+        self.schedule = Schedule()  # Every timer in the rules, by due tick
+        self.enemies_created = 0  # Serial numbers for new enemies
+        self.snake_pool = []  # Removed enemy Snakes, reset and reused by new_enemy
+
+        # Initialize player snake
+        self.player = Snake(
+            [Point(self.grid_width // 2, self.grid_height // 2),
+             Point(self.grid_width // 2 - 1, self.grid_height // 2),
+             Point(self.grid_width // 2 - 2, self.grid_height // 2)],
+            BLUE, LIGHT_BLUE, self.grid, self.grid.player
+        )
+        self.direction = RIGHT  # Start moving right
+
+        # Initialize enemy snakes
+        self.enemies = [self.new_enemy(body) for body in self.initial_enemy_bodies()]
+
+        self.food = None
+        self.player_eggs = EggIndex(self.grid_width, self.grid_height) # Egg objects in laying order, by position
+        self.enemy_eggs = EggIndex(self.grid_width, self.grid_height)
+        self.score = 0
+        self.game_start_time = self.now
+        self.last_player_egg_tick = self.tick
+        self.last_enemy_egg_tick = self.tick
+        self.last_food_tick = self.tick
+        self.schedule.set(FOOD, None, self.last_food_tick + self.ticks(self.food_seconds) + 1)
+        self.schedule.set(PLAYER_EGG, None, self.last_player_egg_tick + self.ticks(self.player_egg_seconds) + 1)
+        self.schedule_enemy_eggs()
+        self.game_over = False
+        self.end_message = ""  # To hold "Game Over" or "You've Won" message
+        self.grew = False  # Track if player snake grew this tick
+        self.game_end_time = 0 # To store the time when game ended
+
+    def initial_enemy_bodies(self):
+        w, h = self.grid_width, self.grid_height
+        return [
+            [Point(w // 4, h // 4), Point(w // 4 + 1, h // 4), Point(w // 4 + 2, h // 4)],
+            [Point(3 * w // 4, 3 * h // 4), Point(3 * w // 4 - 1, h // 4), Point(3 * w // 4 - 2, h // 4)],
+        ]
+
+    def new_enemy(self, body):
+        """A new enemy snake with its first move scheduled; the caller appends it to ``enemies``."""
+        if self.snake_pool: # Recycle a dead enemy rather than allocate
+            enemy = self.snake_pool.pop()
+            enemy.reset(body, RED, ORANGE, self.grid, self.grid.enemies)
+        else:
+            enemy = Snake(body, RED, ORANGE, self.grid, self.grid.enemies)
+        enemy.move_interval = self.ticks(self.enemy_move_seconds) # Normal speed
+        enemy.serial = self.enemies_created
+        self.enemies_created += 1
+        self.schedule_move(enemy)
+        return enemy
+
+    @classmethod
+    def rule_profile(cls):
+        """The ruleset's profile settings as a dict."""
+        return {name: getattr(cls, name) for name in cls.RULE_SETTINGS}
+
+    def ticks(self, seconds):
+        """A duration from the rules as a whole number of ticks (at least the given seconds)."""
+        return math.ceil(seconds / self.frame_time - 1e-9)
+
+    # --- Driving the simulation ---
+
+    def step(self, action=None):
+        """Advance one tick.
+
+        ``action`` is the direction the player asks for (one of DIRECTIONS) or
+        None to keep going straight.  Returns a StepResult for the new state.
+        """
+        if not self.game_over:
+            self.tick += 1
+            self.now = self.tick * self.frame_time
+            if self.instruments is None:
+                self.update(action)
+            else:
+                self.instruments.begin_tick(self.tick)
+                self.update(action)
+                self.instruments.end_tick()
+        return self.result()
+
+    def result(self):
+        return StepResult(self.tick, self.now, self.score, self.game_over, self.end_message,
+                          len(self.player.body), len(self.enemies))
+
+    def end_game(self, message):
+        self.game_over = True
+        self.end_message = message
+        self.game_end_time = self.now # Record game over time
+
+    def phase(self, name):
+        """Context manager timing one phase of update() when instruments are attached."""
+        if self.instruments is None:
+            return NO_PHASE
+        return self.instruments.phase(name)
+
+    def update(self, action=None):
+        current_tick = self.tick
+        phase = self.phase
+
+        with phase("player"):
+            moved = self.move_player(action)
+        if not moved:
+            return
+
+        with phase("enemies"):
+            self.move_enemies(current_tick)
+        if self.game_over: # An enemy can end the game while moving (tail bites)
+            return
+
+        with phase("food"):
+            self.spawn_food(current_tick)
+        with phase("laying"):
+            self.lay_enemy_eggs(current_tick)
+            self.lay_player_egg(current_tick)
+        with phase("collisions"):
+            self.eat_food()
+            resolved = self.resolve_collisions()
+        if not resolved:
+            return
+
+        with phase("hatching"):
+            self.hatch_eggs(current_tick)
+
+        with phase("win check"):
+            # Remove tail if no growth
+            if not self.grew:
+                self.player.pop_tail()
+                if not self.player.body: # Tail bites can leave a single segment behind
+                    self.end_game(f"Game Over! Score: {self.score}")
+                    return
+
+            self.check_win()
+
+    # --- Player ---
+
+    def resolve_direction(self, action):
+        """The requested direction, unless it would reverse the snake onto itself."""
+        if action is not None and action != (-self.direction[0], -self.direction[1]):
+            return action
+        return self.direction
+
+    def out_of_bounds(self, point):
+        return (point.x < 0 or point.x >= self.grid_width or
+                point.y < 0 or point.y >= self.grid_height)
+
+    def move_player(self, action):
+        """Push the player's head; returns False when the rest of the tick is skipped."""
+        new_direction = self.resolve_direction(action)
+        head = self.player.body[0]
+        new_head = Point(head.x + new_direction[0], head.y + new_direction[1])
+
+        # Wall collision: stop and wait for direction change
+        if self.out_of_bounds(new_head):
+            self.direction = new_direction
+            return False
+
+        # Self-collision check
+        if self.player.occupies_before_tail(new_head):
+            self.end_game(f"Game Over! Score: {self.score}")
+            return False
+
+        self.player.push_head(new_head)
+        self.direction = new_direction
+        self.grew = False
+        return True
+
+    # --- Enemies ---
+
+    def move_enemies(self, current_tick):
+        movers = self.due_enemies(current_tick)
+        if movers:
+            self.move_due_enemies(movers, current_tick)
+            for enemy in movers:
+                self.schedule_move(enemy) # After the move, which may have changed its speed
+
+    def move_due_enemies(self, movers, current_tick):
+        """Move the enemies whose move is due (in ``enemies`` order); overridden by every ruleset."""
+        raise NotImplementedError
+
+    def schedule_move(self, enemy):
+        self.schedule.set(MOVE, enemy, enemy.last_move_tick + enemy.move_interval)
+
+    def due_enemies(self, current_tick):
+        """Enemies whose next move is due, in ``enemies`` order, marked as moving on this tick."""
+        movers = []
+        for enemy in self.schedule.pop_due(MOVE, current_tick):
+            if current_tick - enemy.last_move_tick < enemy.move_interval:
+                self.schedule_move(enemy) # Slowed down (turned green) since the move was scheduled
+                continue
+            enemy.last_move_tick = current_tick
+            movers.append(enemy)
+        # The enemies list only ever appends new enemies and drops dead ones, so it is in serial order
+        movers.sort(key=lambda enemy: enemy.serial)
+        return movers
+
+    def clamp(self, x, y):
+        return Point(max(0, min(self.grid_width - 1, x)), max(0, min(self.grid_height - 1, y)))
+
+    def other_enemy_at(self, enemy, point):
+        """True if an enemy other than ``enemy`` has a segment on the point."""
+        return self.grid.enemies[self.grid.cell(point)] > enemy.count_at(point)
+
+    def turn_green(self, enemy):
+        enemy.color = GREEN
+        enemy.head_color = GREEN
+        enemy.is_green = True
+        enemy.move_interval = self.ticks(self.green_move_seconds) # Slower speed
+
+    def update_green_status(self, enemy):
+        # Update enemy snake green status and speed based on length
+        if len(enemy.body) <= 2:
+            if not enemy.is_green: # Only change to green once
+                self.turn_green(enemy)
+        elif enemy.is_green: # Revert to red if grew beyond length 2
+            enemy.color = enemy.original_color # Revert to original color
+            enemy.head_color = ORANGE
+            enemy.is_green = False
+            enemy.move_interval = self.ticks(self.enemy_move_seconds) # Normal speed
+
+    # --- Food and eggs ---
+
+    def spawn_food(self, current_tick):
+        # Spawn food every food_seconds
+        if not self.food and self.schedule.pop_due(FOOD, current_tick):
+            food = self.grid.random_free_point(self.rng) # No snake segment or egg on the cell
+            if food is None: # The board is full; try again next tick
+                self.schedule.set(FOOD, None, current_tick + 1)
+                return
+            self.food = food
+            self.last_food_tick = current_tick
+            self.schedule.set(FOOD, None, current_tick + self.ticks(self.food_seconds) + 1)
+
+    def enemy_egg_interval(self):
+        """Seconds between enemy egg layings."""
+        return self.last_enemy_egg_seconds if len(self.enemies) == 1 else self.enemy_egg_seconds
+
+    def schedule_enemy_eggs(self):
+        self.schedule.set(ENEMY_EGGS, None, self.last_enemy_egg_tick + self.ticks(self.enemy_egg_interval()) + 1)
+
+    def enemy_eggs_due(self, current_tick):
+        """True when the enemies lay this tick; the caller lays and then calls enemy_eggs_laid()."""
+        if not self.schedule.pop_due(ENEMY_EGGS, current_tick):
+            return False
+        if current_tick - self.last_enemy_egg_tick <= self.ticks(self.enemy_egg_interval()):
+            self.schedule_enemy_eggs() # More enemies (a longer interval) since the timer was set
+            return False
+        return True
+
+    def enemy_eggs_laid(self, current_tick):
+        self.last_enemy_egg_tick = current_tick
+        self.schedule_enemy_eggs()
+
+    def lay_enemy_eggs(self, current_tick):
+        # Enemy egg laying (interval from enemy_egg_interval)
+        if self.enemy_eggs_due(current_tick):
+            for enemy in self.enemies:
+                if self.rng.random() < 0.3 and len(enemy.body) >= 3: # Check length >= 3
+                    self.add_egg(self.enemy_eggs, Egg(enemy.body[-1], current_tick, "enemy"))
+                    enemy.pop_tail() # Reduce enemy length by 1 after laying egg
+            self.enemy_eggs_laid(current_tick)
+
+    def lay_player_egg(self, current_tick):
+        # Player egg laying - NO egg lay if length is 2 or less
+        if self.schedule.pop_due(PLAYER_EGG, current_tick):
+            if self.rng.random() < 0.5 and len(self.player.body) >= 3:
+                self.add_egg(self.player_eggs, Egg(self.player.body[-1], current_tick, "player"))
+                self.player.pop_tail() # Reduce player length by 1 after laying egg
+            self.last_player_egg_tick = current_tick
+            self.schedule.set(PLAYER_EGG, None, current_tick + self.ticks(self.player_egg_seconds) + 1)
+
+    def eat_food(self):
+        # Collision with food
+        if self.food and self.player.body[0] == self.food:
+            self.grew = True
+            self.food = None
+            self.score += 10
+
+    def hatch_eggs(self, current_tick):
+        # Hatch eggs - hatch_seconds after laying (scheduled by add_egg, in laying order)
+        hatching = self.schedule.pop_due(HATCH, current_tick)
+        if not hatching:
+            return
+        for eggs, egg_obj in hatching:
+            if eggs is self.player_eggs:
+                self.remove_egg(self.player_eggs, egg_obj)
+                self.score += 100
+
+        for eggs, egg_obj in hatching:
+            if eggs is not self.enemy_eggs:
+                continue
+            self.remove_egg(self.enemy_eggs, egg_obj)
+            pos = egg_obj.get_point()
+            self.enemies.append(self.new_enemy([pos,
+                                                Point(max(0, min(self.grid_width - 1, pos.x - 1)), pos.y),
+                                                Point(max(0, min(self.grid_width - 1, pos.x - 2)), pos.y)]))
+
+    def add_egg(self, eggs, egg_obj):
+        eggs.append(egg_obj)
+        self.grid.add_egg(egg_obj.get_point())
+        self.schedule.set(HATCH, (eggs, egg_obj), egg_obj.tick_laid + self.ticks(self.hatch_seconds))
+
+    def remove_egg(self, eggs, egg_obj):
+        eggs.remove(egg_obj)
+        self.grid.remove_egg(egg_obj.get_point())
+        self.schedule.cancel(HATCH, (eggs, egg_obj))
+
+    # --- Collisions ---
+
+    def resolve_collisions(self):
+        """Player vs eggs and enemies; returns False if the game ended."""
+        enemies_to_remove = []
+        enemy_eggs_to_remove = []
+
+        # Collision with Enemy Eggs
+        egg_obj = self.enemy_eggs.first_at(self.player.body[0])
+        if egg_obj is not None:
+            self.grew = True # Player snake grows
+            enemy_eggs_to_remove.append(egg_obj) # Remove the egg
+            self.score += 50 # Add score for eating enemy egg (only one egg per tick)
+
+        # Player no longer collides with Player Eggs
+
+        if not self.collide_enemies(enemies_to_remove):
+            return False
+
+        # Remove eaten enemy eggs
+        for egg_obj in enemy_eggs_to_remove:
+            self.remove_egg(self.enemy_eggs, egg_obj)
+            self.grew = True
+
+        if enemies_to_remove:
+            for i in sorted(enemies_to_remove, reverse=True):
+                enemy = self.enemies.pop(i)
+                enemy.remove_from_grid()
+                self.schedule.cancel(MOVE, enemy)
+                self.snake_pool.append(enemy)
+            self.schedule_enemy_eggs() # Fewer enemies can shorten the laying interval
+        return True
+
+    def collide_enemies(self, enemies_to_remove):
+        raise NotImplementedError
+
+    def check_win(self):
+        # Win condition: check if all enemy snakes are eaten
+        if not self.enemies:
+            self.end_game(f"You've Won! Score: {self.score}")
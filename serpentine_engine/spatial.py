@@ -0,0 +1,124 @@
+"""Eggs indexed by position.
+
+An EggIndex stands in for the plain egg lists: it iterates in laying order
+and supports append() and remove(), but removal is O(1) and the eggs are
+also hashed into square buckets of cells, so "which egg is on this cell",
+"first egg in this box" and "nearest egg" only look at the buckets around
+the point.  Answers are the same as a scan of the list in laying order
+would give (ties go to the egg laid first).
+"""
+BUCKET_SIZE = 8  # Bucket edge in cells
+# Up to this many eggs a plain scan beats walking buckets
+SCAN_MAX_EGGS = 16
+
+
+class EggIndex:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.order = {}  # Egg -> laying sequence number; dict order is laying order
+        self.buckets = {}  # (bucket x, bucket y) -> {egg: None}
+        self.cells = {}  # Point -> {egg: None} for the eggs on that cell (they can stack)
+        self.next_sequence = 0
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def append(self, egg_obj):
+        point = egg_obj.point
+        self.order[egg_obj] = self.next_sequence
+        self.next_sequence += 1
+        self.buckets.setdefault((point.x // BUCKET_SIZE, point.y // BUCKET_SIZE), {})[egg_obj] = None
+        self.cells.setdefault(point, {})[egg_obj] = None
+
+    def remove(self, egg_obj):
+        point = egg_obj.point
+        del self.order[egg_obj]
+        for table, key in ((self.buckets, (point.x // BUCKET_SIZE, point.y // BUCKET_SIZE)), (self.cells, point)):
+            eggs = table[key]
+            del eggs[egg_obj]
+            if not eggs:
+                del table[key]
+
+    def laid_before(self, egg_obj, other):
+        """Whether ``egg_obj`` was laid before ``other``."""
+        return self.order[egg_obj] < self.order[other]
+
+    def first_at(self, point):
+        """The first-laid egg on ``point``, or None."""
+        eggs = self.cells.get(point)
+        return next(iter(eggs)) if eggs else None
+
+    def first_in_range(self, point, range_x, range_y):
+        """The first-laid egg with ``|dx| <= range_x`` and ``|dy| <= range_y`` from ``point``, or None."""
+        best = None
+        for egg_obj in self.candidates(point, range_x, range_y):
+            egg = egg_obj.point
+            if abs(point.x - egg.x) <= range_x and abs(point.y - egg.y) <= range_y:
+                if best is None or self.order[egg_obj] < self.order[best]:
+                    best = egg_obj
+        return best
+
+    def by_distance(self, point, max_distance):
+        """Eggs within Manhattan ``max_distance`` of ``point`` as ``(distance, egg)``, nearest (then first laid) first."""
+        reach = int(max_distance)
+        found = []
+        for egg_obj in self.candidates(point, reach, reach):
+            distance = abs(point.x - egg_obj.point.x) + abs(point.y - egg_obj.point.y)
+            if distance <= max_distance:
+                found.append((distance, self.order[egg_obj], egg_obj))
+        found.sort(key=lambda entry: entry[:2])
+        return [(distance, egg_obj) for distance, _, egg_obj in found]
+
+    def nearest(self, point, max_distance):
+        """The egg nearest to ``point`` by Manhattan distance, if within ``max_distance``, as ``(distance, egg)``.
+
+        Walks square rings of buckets outwards and stops once a ring cannot
+        hold anything nearer than the best egg found so far.
+        """
+        if len(self.order) <= SCAN_MAX_EGGS:
+            found = self.by_distance(point, max_distance)
+            return found[0] if found else (None, None)
+        center_x, center_y = point.x // BUCKET_SIZE, point.y // BUCKET_SIZE
+        last_ring = max(self.width, self.height) // BUCKET_SIZE + 1
+        best = None  # (distance, sequence, egg)
+        for ring in range(last_ring + 1):
+            closest_possible = max(0, (ring - 1) * BUCKET_SIZE + 1)
+            if closest_possible > max_distance or (best is not None and closest_possible > best[0]):
+                break
+            for key in _ring(center_x, center_y, ring):
+                for egg_obj in self.buckets.get(key, ()):
+                    distance = abs(point.x - egg_obj.point.x) + abs(point.y - egg_obj.point.y)
+                    if distance <= max_distance:
+                        entry = (distance, self.order[egg_obj], egg_obj)
+                        if best is None or entry[:2] < best[:2]:
+                            best = entry
+        return (best[0], best[2]) if best is not None else (None, None)
+
+    def candidates(self, point, range_x, range_y):
+        """Eggs in the buckets covering the box around ``point`` (or all eggs when that is fewer to look at)."""
+        low_x, high_x = (point.x - range_x) // BUCKET_SIZE, (point.x + range_x) // BUCKET_SIZE
+        low_y, high_y = (point.y - range_y) // BUCKET_SIZE, (point.y + range_y) // BUCKET_SIZE
+        if len(self.order) <= SCAN_MAX_EGGS or (high_x - low_x + 1) * (high_y - low_y + 1) >= len(self.buckets):
+            return list(self.order)
+        eggs = []
+        for bucket_y in range(low_y, high_y + 1):
+            for bucket_x in range(low_x, high_x + 1):
+                eggs.extend(self.buckets.get((bucket_x, bucket_y), ()))
+        return eggs
+
+
+def _ring(center_x, center_y, ring):
+    """Bucket keys at Chebyshev distance ``ring`` from the center bucket."""
+    if ring == 0:
+        yield center_x, center_y
+        return
+    for x in range(center_x - ring, center_x + ring + 1):
+        yield x, center_y - ring
+        yield x, center_y + ring
+    for y in range(center_y - ring + 1, center_y + ring):
+        yield center_x - ring, y
+        yield center_x + ring, y
@@ -0,0 +1,392 @@
+"""v5 rules (serpentine.hard.v5.py): A* pathfinding enemies with persistent targets."""
+import concurrent.futures
+import logging
+import time
+
+from . import pathfinding
+from .model import Point, Egg, RED, GREEN
+from .planning import default_planner
+from .simulation import Simulation, DIRECTIONS
+
+logger = logging.getLogger(__name__)
+
+# Minimum enemy length after stuck reduction
+ENEMY_MIN_LENGTH_AFTER_STUCK = 2
+
+
+class V5Simulation(Simulation):
+    grid_width = 80
+    grid_height = 60
+    last_enemy_egg_seconds = 10
+    chase_move_seconds = 0.025  # Between the moves of a red enemy chasing an egg or the tail
+    tail_chase_distance = 25  # Enemies chase the player's tail within this path length (Manhattan distance without one)
+    stuck_seconds = 3
+    # Farthest an enemy looks for eggs and food: the full range of the standard 80x60 board.
+    # Bigger worlds do not widen it, so searches stay local however large the world is.
+    max_detection_range = 140
+    search = "astar"  # Key into pathfinding.SEARCHES: "astar", or "jps" for Jump Point Search
+
+    RULE_SETTINGS = Simulation.RULE_SETTINGS + ("chase_move_seconds", "tail_chase_distance", "max_detection_range",
+                                                "search")
+
+    def __init__(self, grid_width=None, grid_height=None, frame_time=0.1, planner=None, search=None,
+                 seed=None, rng=None):
+        # Planner that runs plan_move for each due enemy (shared worker threads by default)
+        self.planner = planner if planner is not None else default_planner()
+        if search is not None:
+            self.search = search
+        self.obstacles = None  # obstacle_flags() snapshot searched by find_path
+        super().__init__(grid_width, grid_height, frame_time, seed, rng)
+
+    def new_enemy(self, body):
+        enemy = super().new_enemy(body)
+        enemy.last_head_position = body[0] # Initialize with initial head position
+        enemy.last_head_move_tick = self.tick
+        return enemy
+
+    def move_player(self, action):
+        new_direction = self.resolve_direction(action)
+        head = self.player.body[0]
+        new_head = Point(head.x + new_direction[0], head.y + new_direction[1])
+
+        # Wall collision: refuse the move (and any turn that is still out of bounds)
+        if self.out_of_bounds(new_head):
+            return False
+
+        # Self-collision check
+        if self.player.occupies_before_tail(new_head):
+            self.end_game(f"Game Over! Score: {self.score}")
+            return False
+
+        self.player.push_head(new_head)
+        self.direction = new_direction
+        self.grew = False
+        return True
+
+    # --- Debug controls ---
+
+    def grow_enemies(self, segments=5):
+        for enemy in self.enemies:
+            enemy.grow(segments) # Add segments to each enemy
+
+    def shrink_enemies(self):
+        for enemy in self.enemies:
+            if len(enemy.body) > 2: # Ensure enemy length is at least 2 after decrease
+                enemy.pop_tail() # Remove 1 tail segment from each enemy
+
+    # --- Pathfinding ---
+
+    def find_path(self, start_point, end_point, exclude_snake_body=None, target_type_to_ignore=None, stats=None):
+        """Search (A* or JPS) over the obstacle snapshot taken by plan_moves; returns the Points from start to end or None."""
+        grid = self.grid
+        own_tail = self.own_tail_cell(exclude_snake_body) if exclude_snake_body is not None else -1
+        path = pathfinding.SEARCHES[self.search](self.obstacles, grid.width, grid.height, grid.cell(start_point),
+                                     grid.cell(end_point), target_type_to_ignore == "egg", own_tail, stats)
+        if path is None:
+            return None
+        return [Point(cell % grid.width, cell // grid.width) for cell in path]
+
+    def plan_moves(self, enemy_indices):
+        """Plan moves for a batch of enemies; returns one future per enemy."""
+        self.obstacles = self.grid.obstacle_flags()  # One blocked bitmap per tick, shared by every search
+        return self.planner.plan_moves(self, enemy_indices)
+
+    def plan_move(self, enemy_index):
+        """Target selection and pathfinding for one enemy; returns its next cell or None.
+
+        Runs on planner worker threads, so it only writes to this enemy's own
+        target fields and reads the rest of the board.
+        """
+        enemy = self.enemies[enemy_index]
+        target_point = self.select_target(enemy_index)
+
+        next_move_point = None
+        if target_point: # Pathfind to target (either egg or food or tail)
+            target_type_ignore = "egg" if enemy.target_type == "egg" else None
+            instruments = self.instruments
+            if instruments is None:
+                path = self.find_path(enemy.body[0], target_point, exclude_snake_body=enemy, target_type_to_ignore=target_type_ignore)
+            else:
+                stats = {}
+                started = time.perf_counter()
+                path = self.find_path(enemy.body[0], target_point, exclude_snake_body=enemy,
+                                      target_type_to_ignore=target_type_ignore, stats=stats)
+                instruments.record_search(enemy_index, started, time.perf_counter(), stats["expanded"])
+            if path and len(path) > 1:
+                next_move_point = path[1]
+        return next_move_point
+
+    def path_request(self, enemy_index, distance=None):
+        """Select the enemy's target and describe its search with flat cell ids.
+
+        Returns None when there is nothing to search for, else
+        ``(start, goal, ignore_eggs, own_tail)`` where ``own_tail`` is
+        own_tail_cell(enemy).  Used by planners that search outside this
+        process; ``distance`` is passed on to select_target.
+        """
+        enemy = self.enemies[enemy_index]
+        target_point = self.select_target(enemy_index, distance)
+        if not target_point:
+            return None
+        grid = self.grid
+        return grid.cell(enemy.body[0]), grid.cell(target_point), enemy.target_type == "egg", self.own_tail_cell(enemy)
+
+    def own_tail_cell(self, enemy):
+        """The enemy's tail cell if its head may move onto it (nothing else is there), else -1."""
+        grid = self.grid
+        tail = enemy.body[-1]
+        tail_cell = grid.cell(tail)
+        if (not grid.player[tail_cell] and grid.enemies[tail_cell] == enemy.cells[tail_cell]
+                and not enemy.occupies_before_tail(tail)):
+            return tail_cell
+        return -1
+
+    def select_target(self, enemy_index, distance=None):
+        """Closest egg, food or player tail in range; updates the enemy's target and returns the point to chase.
+
+        Closeness is Manhattan distance unless ``distance(point, target_type)``
+        is given, which returns the path length from the enemy's head (or None
+        when the point cannot be reached, which rules it out).
+        """
+        game_state = self
+        enemy = game_state.enemies[enemy_index]
+        e_head = enemy.body[0]
+        target_point = None
+
+        # Determine detection range based on enemy count
+        detection_range = self.grid_width + self.grid_height  # Default full range
+        if len(game_state.enemies) > 1:
+            detection_range = (self.grid_width + self.grid_height) * 0.5  # 50% reduced range
+        detection_range = min(detection_range, self.max_detection_range)
+
+        # Check if enemy needs target cleared due to being stuck
+        if enemy.stuck_clear_target:
+            enemy.stuck_clear_target = False
+            enemy.target = None
+
+        # Check if enemy already has a target
+        if enemy.target:
+            target_point = enemy.target
+
+            if enemy.target_type == "food" and (game_state.food is None or game_state.food != enemy.target):
+                enemy.target = None
+                target_point = None
+            elif enemy.target_type == "egg":
+                if game_state.player_eggs.first_at(enemy.target) is None: # Egg gone
+                    enemy.target = None
+                    target_point = None
+            elif enemy.target_type == "tail": # Check for tail target validity
+                if len(game_state.player.body) <= 1 or game_state.player.body[-1] != enemy.target: # Player tail no longer valid
+                    enemy.target = None
+                    target_point = None
+
+        # --- Closest Target Logic ---
+        closest_target_point = None
+        min_target_distance = float('inf')
+        chosen_target_type = None
+
+        # Check for closest egg (nearby buckets of the egg index only)
+        if distance:
+            # Path lengths are never shorter than Manhattan distance, so stop once eggs are farther than the best path
+            closest_egg = None
+            for manhattan, egg_obj in game_state.player_eggs.by_distance(e_head, detection_range):
+                if manhattan > min_target_distance:
+                    break
+                distance_to_egg = distance(egg_obj.get_point(), "egg")
+                if distance_to_egg is not None and distance_to_egg <= detection_range:
+                    # Equal path lengths go to the egg laid first
+                    if distance_to_egg < min_target_distance or (
+                            distance_to_egg == min_target_distance
+                            and game_state.player_eggs.laid_before(egg_obj, closest_egg)):
+                        min_target_distance = distance_to_egg
+                        closest_egg = egg_obj
+                        closest_target_point = egg_obj.get_point()
+                        chosen_target_type = "egg"
+        else:
+            distance_to_egg, egg_obj = game_state.player_eggs.nearest(e_head, detection_range)
+            if egg_obj is not None:
+                min_target_distance = distance_to_egg
+                closest_target_point = egg_obj.get_point()
+                chosen_target_type = "egg"
+
+        # Check for closest food (if no egg closer or no eggs found)
+        if game_state.food:
+            if distance:
+                distance_to_food = distance(game_state.food, "food")
+            else:
+                distance_to_food = abs(e_head.x - game_state.food.x) + abs(e_head.y - game_state.food.y)
+
+            if distance_to_food is not None and distance_to_food <= detection_range:
+                if distance_to_food < min_target_distance: # Closer than current closest
+                    min_target_distance = distance_to_food
+                    closest_target_point = game_state.food
+                    chosen_target_type = "food"
+
+        # Check for player tail (if no egg or food closer or none found)
+        if len(game_state.player.body) > 1 and self.tail_chase_distance is not None: # Player needs to have a tail
+            player_tail = game_state.player.body[-1] # Get player tail
+            if distance:
+                distance_to_tail = distance(player_tail, "tail")
+            else:
+                distance_to_tail = abs(e_head.x - player_tail.x) + abs(e_head.y - player_tail.y)
+
+            if distance_to_tail is not None and distance_to_tail <= self.tail_chase_distance: # Tail detection range
+                if distance_to_tail < min_target_distance: # Closer than current closest
+                    closest_target_point = player_tail
+                    chosen_target_type = "tail"
+
+        if closest_target_point: # Set the closest target
+            target_point = closest_target_point
+            enemy.target = closest_target_point
+            enemy.target_type = chosen_target_type
+        else: # No target found in range
+            enemy.target = None
+            enemy.target_type = None
+        # --- END Closest Target Logic ---
+
+        return target_point
+
+    # --- Enemy movement ---
+
+    def move_due_enemies(self, movers, current_tick):
+        if len(movers) == len(self.enemies):
+            active_enemies_indices = list(range(len(movers))) # Everyone moves (the usual case)
+        else:
+            index = {enemy: i for i, enemy in enumerate(self.enemies)}
+            active_enemies_indices = [index[enemy] for enemy in movers] # Indices of enemies due to move this tick
+
+        # Plan every due enemy against the same board, then apply the moves in order
+        futures = self.plan_moves(active_enemies_indices)
+        concurrent.futures.wait(futures)
+        for enemy_index, future in zip(active_enemies_indices, futures):
+            self.apply_enemy_move(enemy_index, self.enemies[enemy_index], future.result(), current_tick)
+
+    def apply_enemy_move(self, enemy_index, enemy, next_move_point, current_tick):
+        """Moves one enemy to its planned cell (or a random fallback) and applies what it eats."""
+        e_head = enemy.body[0]
+        enemy_grew = False
+
+        if next_move_point: # Move based on pathfinding result
+            new_e_head = next_move_point
+        else: # Fallback to random movement (if no path)
+            valid_moves = []
+            for move in DIRECTIONS:
+                dx, dy = move
+                new_e_head_temp = self.clamp(e_head.x + dx, e_head.y + dy)
+                if not self.other_enemy_at(enemy, new_e_head_temp):
+                    valid_moves.append(move)
+
+            if valid_moves:
+                dx, dy = self.rng.choice(valid_moves)
+            else: # No valid moves
+                moves = [(0, -1), (0, 1), (-1, 0)]
+                dx, dy = self.rng.choice(moves)
+            new_e_head = self.clamp(e_head.x + dx, e_head.y + dy)
+
+        # Stuck enemy detection: Check if head position changed
+        if new_e_head == enemy.last_head_position:
+            if (self.stuck_seconds is not None
+                    and current_tick - enemy.last_head_move_tick >= self.ticks(self.stuck_seconds)): # Stuck too long
+                enemy.stuck_clear_target = True # Set flag to clear target next cycle
+                enemy.target = None # Clear target to unstuck enemy
+                enemy.target_type = None # Clear target type as well
+
+                # Reduce enemy snake length if stuck
+                if len(enemy.body) > ENEMY_MIN_LENGTH_AFTER_STUCK:
+                    enemy.pop_tail() # Remove tail segment
+                    logger.debug("enemy snake %d is stuck, length reduced to %d", enemy_index + 1, len(enemy.body))
+                else:
+                    logger.debug("enemy snake %d is stuck (min length reached)", enemy_index + 1)
+        else: # Head position changed
+            enemy.last_head_position = e_head # Update last head position
+            enemy.last_head_move_tick = current_tick # Update last move tick
+
+        if not enemy.occupies(new_e_head):
+            enemy.push_head(new_e_head)
+            # Consumption checks:
+            if enemy.target_type == "food": # Food Consumption Check
+                if enemy.target and new_e_head == enemy.target:
+                    enemy.grow(1)
+                    self.food = None
+                    enemy_grew = True
+                    enemy.target = None
+                    enemy.target_type = None
+            elif enemy.target_type == "egg": # Egg Consumption Check
+                if enemy.target and new_e_head == enemy.target:
+                    enemy.grow(2)
+                    enemy_grew = True
+                    egg_obj_to_remove = self.player_eggs.first_at(enemy.target)
+                    if egg_obj_to_remove is not None:
+                        self.remove_egg(self.player_eggs, egg_obj_to_remove)
+                    enemy.target = None
+                    enemy.target_type = None
+            elif enemy.target_type == "tail": # Tail Consumption Check (no growth for now)
+                if enemy.target and new_e_head == enemy.target:
+                    enemy.target = None # Invalidate target after reaching it
+                    enemy.target_type = None
+
+            if not enemy_grew:
+                enemy.pop_tail()
+
+        # Vary Enemy Speed based on Target
+        if enemy.color == RED: # Only for RED enemies
+            if enemy.target_type == "tail":
+                enemy.move_interval = self.ticks(self.chase_move_seconds)
+            elif enemy.target_type == "food":
+                enemy.move_interval = self.ticks(self.enemy_move_seconds)
+            elif enemy.target_type == "egg":
+                enemy.move_interval = self.ticks(self.chase_move_seconds)
+            else: # No specific target type, revert to default interval for Red snake
+                enemy.move_interval = self.ticks(self.enemy_move_seconds)
+        else: # For non-RED enemies, keep default interval
+            enemy.move_interval = self.ticks(self.enemy_move_seconds)
+
+        # Update enemy snake green status and speed (Green status speed logic remains unchanged)
+        self.update_green_status(enemy)
+
+    # --- Eggs and collisions ---
+
+    def lay_enemy_eggs(self, current_tick):
+        # Enemy egg laying (reduced chance with more enemies)
+        if self.enemy_eggs_due(current_tick):
+            enemy_egg_laying_probability = 1.0 # Default probability (100%)
+            if len(self.enemies) >= 2:
+                enemy_egg_laying_probability = 0.5 # 50% chance with 2+ enemies
+            for enemy in self.enemies:
+                if self.rng.random() < enemy_egg_laying_probability and len(enemy.body) >= 3:
+                    self.add_egg(self.enemy_eggs, Egg(enemy.body[-1], current_tick, "enemy"))
+                    if len(enemy.body) > 3: # Ensure snake remains at least length 3
+                        enemy.pop_tail() # Only pop tail if length > 3
+            self.enemy_eggs_laid(current_tick)
+
+    def collide_enemies(self, enemies_to_remove):
+        # Collision with Enemies (enemy can consume player body)
+        for i, enemy in enumerate(self.enemies):
+            if self.player.body[0] == enemy.body[0]: # Player head to enemy head collision
+                if enemy.color == GREEN: # Green enemy loses
+                    enemies_to_remove.append(i)
+                    self.grew = True
+                    self.score += 50
+                else: # Non-green enemy wins - game over for player
+                    self.end_game(f"Game Over! Score: {self.score}")
+                    return False
+            elif enemy.occupies_behind_head(self.player.body[0]): # Player head to enemy body
+                original_enemy_length = len(enemy.body)
+                pos = enemy.segment_index(self.player.body[0])
+                enemy.truncate(pos)
+                removed_length = original_enemy_length - len(enemy.body)
+                self.player.grow(removed_length)
+                self.grew = True
+                if len(enemy.body) <= 2:
+                    self.turn_green(enemy)
+            elif self.player.occupies(enemy.body[0]): # Enemy head to player body collision
+                if self.player.segment_index(enemy.body[0]) != 0: # ...but not if enemy head hits player head (already handled above)
+                    original_player_length = len(self.player.body)
+                    pos = self.player.segment_index(enemy.body[0])
+                    self.player.truncate(pos) # Player loses body segments
+                    removed_length = original_player_length - len(self.player.body)
+                    enemy.grow(removed_length) # Enemy grows
+                    if len(self.player.body) <= 2: # Check if player is now too short - game over
+                        self.end_game(f"Game Over! Score: {self.score} - Eaten by Enemy!")
+                        return False
+        return True
@@ -0,0 +1,15 @@
+import random
+
+import pygame
+
+from serpentine_engine.frontend import merge_rects
+
+
+def test_merged_rects_cover_the_same_pixels_without_overlapping():
+    rng = random.Random(0)
+    for _ in range(200):
+        rects = [pygame.Rect(rng.randrange(100), rng.randrange(100), rng.randrange(1, 30), rng.randrange(1, 30))
+                 for _ in range(rng.randrange(1, 12))]
+        merged = merge_rects(rects)
+        assert all(rect.collidelist(merged[:index]) == -1 for index, rect in enumerate(merged))
+        assert all(any(outer.contains(rect) for outer in merged) for rect in rects)
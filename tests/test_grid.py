@@ -0,0 +1,17 @@
+import random
+
+from serpentine_engine import DIRECTIONS, RULESETS
+from serpentine_engine.grid import SNAKE, EGG
+
+
+def test_obstacle_flags_follow_the_layers():
+    for name, ruleset in sorted(RULESETS.items()):
+        for seed in range(3):
+            sim = ruleset(None, None, 0.1, seed=seed)
+            grid = sim.grid
+            inputs = random.Random(seed)
+            while not sim.game_over and sim.tick < 1000:
+                sim.step(inputs.choice(DIRECTIONS) if inputs.random() < 0.1 else None)
+                expected = bytes((SNAKE if player or enemies else 0) | (EGG if eggs else 0)
+                                 for player, enemies, eggs in zip(grid.player, grid.enemies, grid.eggs))
+                assert grid.obstacle_flags() == expected, (name, seed, sim.tick)
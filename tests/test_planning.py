@@ -0,0 +1,78 @@
+import random
+
+from serpentine_engine import DIRECTIONS, InlinePlanner, ProcessPlanner, V5Simulation
+from serpentine_engine import planning
+from serpentine_engine.grid import SNAKE
+from serpentine_engine.pathfinding import DStarLite, find_path, next_step
+
+
+def play(planner, width, height, seed, ticks=300):
+    sim = V5Simulation(width, height, planner=planner, search="jps", seed=seed)
+    inputs = random.Random(seed)
+    states = []
+    while not sim.game_over and sim.tick < ticks:
+        sim.step(inputs.choice(DIRECTIONS) if inputs.random() < 0.1 else None)
+        states.append((tuple(sim.player.body), tuple(tuple(enemy.body) for enemy in sim.enemies), sim.food))
+    return states
+
+
+def test_process_planner_reused_on_a_smaller_board():
+    planner = ProcessPlanner(max_workers=2)
+    try:
+        assert play(planner, 80, 60, 1) == play(InlinePlanner(), 80, 60, 1)
+        for seed in range(20, 25):
+            assert play(planner, 20, 15, seed) == play(InlinePlanner(), 20, 15, seed), seed
+    finally:
+        planner.shutdown()
+
+
+def test_worker_searches_only_the_published_board():
+    # A block left over from a bigger board must not be searched past width * height cells
+    planner = ProcessPlanner(max_workers=1)
+    layout = random.Random(0)
+    width, height = 20, 15
+    try:
+        planner.publish(bytes([0]) * 80 * 60)
+        for _ in range(300):
+            flags = bytes(SNAKE if layout.random() < 0.2 else 0 for _ in range(width * height))
+            start, goal = layout.randrange(width * height), layout.randrange(width * height)
+            planner.publish(flags)
+            for search in ("astar", "jps"):
+                assert (planning._next_step_in_worker(planner.shared.name, width, height, start, goal, False, -1, search)
+                        == next_step(flags, width, height, start, goal, search=search))
+    finally:
+        planner.shutdown()
+        if planning._attached is not None:
+            planning._attached.close()
+            planning._attached = None
+
+
+def path_length(flags, width, height, start, goal):
+    path = find_path(bytes(flags), width, height, start, goal)
+    return None if path is None else len(path) - 1
+
+
+def test_d_star_lite_steps_match_a_star_as_cells_change():
+    layout = random.Random(0)
+    width, height = 12, 10
+    for _ in range(200):
+        flags = bytearray(SNAKE if layout.random() < 0.15 else 0 for _ in range(width * height))
+        start, goal = layout.randrange(width * height), layout.randrange(width * height)
+        flags[start] = 0
+        search = DStarLite(width, height, start, goal, lambda cell: flags[cell])  # The goal may start out blocked
+        for _ in range(10):
+            # Batches that flip the goal along with cells near it
+            changed = [layout.randrange(width * height) for _ in range(layout.randrange(1, 4))]
+            if layout.random() < 0.3:
+                changed.append(goal)
+            for cell in changed:
+                if cell != start:
+                    flags[cell] ^= SNAKE
+            search.cells_changed(changed)
+            step = search.next_step()
+            length = path_length(flags, width, height, start, goal)
+            if length is None or start == goal:
+                assert step == -1
+            else:
+                # Equally short paths may start differently
+                assert path_length(flags, width, height, step, goal) == length - 1